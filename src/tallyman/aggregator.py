@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 
-from collections import defaultdict
 from collections.abc import Iterable
 from dataclasses import dataclass, field
+from operator import attrgetter
 
 from tallyman.counter import FileCount
 from tallyman.languages import Language
@@ -63,11 +63,13 @@ def aggregate(file_results: Iterable[tuple[Language, FileCount]]) -> TallyResult
     different categories (e.g. Markdown in docs vs specs) stays separate.
     """
     by_lang: dict[Language, LanguageStats] = {}
+    grand_total = 0
 
     for language, counts in file_results:
-        if language not in by_lang:
-            by_lang[language] = LanguageStats(language=language)
-        stats = by_lang[language]
+        stats = by_lang.get(language)
+        if stats is None:
+            stats = by_lang[language] = LanguageStats(language=language)
+        grand_total += counts.total_lines
         stats.file_count += 1
         stats.total_lines += counts.total_lines
         stats.code_lines += counts.code_lines
@@ -75,34 +77,23 @@ def aggregate(file_results: Iterable[tuple[Language, FileCount]]) -> TallyResult
         stats.blank_lines += counts.blank_lines
 
     # Sort by total lines descending
-    sorted_langs = sorted(by_lang.values(), key=lambda s: s.total_lines, reverse=True)
+    sorted_langs = sorted(by_lang.values(), key=attrgetter('total_lines'), reverse=True)
 
-    # Build category stats
-    cat_lines: defaultdict[str, int] = defaultdict(int)
-    cat_effective: defaultdict[str, int] = defaultdict(int)
-    cat_langs: defaultdict[str, list[str]] = defaultdict(list)
+    # Build category stats, hashing each category once per language
+    cat_stats: dict[str, CategoryStats] = {}
     for stats in sorted_langs:
-        cat = stats.language.category
-        cat_lines[cat] += stats.total_lines
-        if stats.language.single_line_comment is not None:
-            cat_effective[cat] += stats.non_blank_non_comment
+        cat_key = stats.language.category
+        cat = cat_stats.get(cat_key)
+        if cat is None:
+            cat = cat_stats[cat_key] = CategoryStats(name=CATEGORY_DISPLAY_NAMES.get(cat_key, cat_key))
+        cat.total_lines += stats.total_lines
+        if stats.language.has_comment_marker:
+            cat.effective_lines += stats.code_lines
         else:
-            cat_effective[cat] += stats.non_blank
-        cat_langs[cat].append(stats.language.name)
-
-    categories = []
-    for cat_key in CATEGORY_ORDER:
-        if cat_key in cat_lines:
-            categories.append(
-                CategoryStats(
-                    name=CATEGORY_DISPLAY_NAMES[cat_key],
-                    total_lines=cat_lines[cat_key],
-                    effective_lines=cat_effective[cat_key],
-                    languages=cat_langs[cat_key],
-                )
-            )
-
-    grand_total = sum(s.total_lines for s in sorted_langs)
+            cat.effective_lines += stats.non_blank
+        cat.languages.append(stats.language.name)
+
+    categories = [cat_stats[cat_key] for cat_key in CATEGORY_ORDER if cat_key in cat_stats]
 
     return TallyResult(
         by_language=sorted_langs,
@@ -118,4 +109,7 @@ def language_percentages(result: TallyResult) -> list[tuple[Language, float]]:
     """
     if result.grand_total_lines == 0:
         return []
-    return [(s.language, s.total_lines / result.grand_total_lines * 100) for s in result.by_language]
+    if len(result.by_language) == 1:
+        return [(result.by_language[0].language, 100.0)]
+    scale = 100.0 / result.grand_total_lines
+    return [(s.language, s.total_lines * scale) for s in result.by_language]
@@ -10,7 +10,7 @@ from pathlib import Path
 from tallyman import __version__
 from tallyman.aggregator import aggregate
 from tallyman.config import CONFIG_FILENAME, TallyConfig, discover_nested_configs, find_config, load_config, save_config
-from tallyman.counter import count_lines
+from tallyman.counter import count_files
 from tallyman.display import display_results
 from tallyman.tui.setup_app import run_setup
 from tallyman.walker import load_gitignore, walk_project
@@ -47,6 +47,14 @@ def build_parser() -> argparse.ArgumentParser:
         action='store_true',
         help='Generate a light-themed summary image on the Desktop',
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Number of worker processes for counting lines (default: one per CPU)',
+    )
     parser.add_argument(
         '--version',
         action='version',
@@ -64,6 +72,9 @@ def main() -> None:
         print(f'Error: {root} is not a directory', file=sys.stderr)
         sys.exit(1)
 
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+
     # Load gitignore
     gitignore_spec = load_gitignore(root)
 
@@ -89,14 +100,9 @@ def main() -> None:
         excluded_dirs, spec_dirs = result
         save_config(config_path, excluded_dirs, spec_dirs)
 
-    # Walk and count
-    file_results = []
-    for file_path, language in walk_project(root, excluded_dirs, gitignore_spec, spec_dirs):
-        counts = count_lines(file_path, language)
-        file_results.append((language, counts))
-
-    # Aggregate
-    tally = aggregate(file_results)
+    # Walk, count, and aggregate as a stream so per-file counts are dropped once tallied
+    files = walk_project(root, excluded_dirs, gitignore_spec, spec_dirs)
+    tally = aggregate(count_files(files, jobs=args.jobs))
 
     # Display
     no_color = args.no_color or os.environ.get('NO_COLOR') is not None
@@ -53,10 +53,14 @@ def discover_nested_configs(root: Path) -> TallyConfig:
     merged_excluded: set[str] = set()
     merged_specs: set[str] = set()
 
-    for dirpath_str, dirnames, _filenames in os.walk(root, topdown=True, followlinks=False):
+    for dirpath_str, dirnames, filenames in os.walk(root, topdown=True, followlinks=False):
         # Skip hidden directories (e.g. .git, .venv)
         dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
 
+        # The listing already names every file, so directories without a config cost no stat
+        if CONFIG_FILENAME not in filenames:
+            continue
+
         dirpath = Path(dirpath_str)
         rel_dir = dirpath.relative_to(root)
         rel_dir_str = str(rel_dir) if rel_dir.parts else ''
@@ -64,16 +68,14 @@ def discover_nested_configs(root: Path) -> TallyConfig:
         if not rel_dir_str:
             continue
 
-        config_file = dirpath / CONFIG_FILENAME
-        if config_file.is_file():
-            try:
-                nested = load_config(config_file)
-                for excl in nested.excluded_dirs:
-                    merged_excluded.add(f'{rel_dir_str}/{excl}')
-                for spec in nested.spec_dirs:
-                    merged_specs.add(f'{rel_dir_str}/{spec}')
-            except Exception:
-                pass  # Skip malformed configs
+        try:
+            nested = load_config(dirpath / CONFIG_FILENAME)
+            for excl in nested.excluded_dirs:
+                merged_excluded.add(f'{rel_dir_str}/{excl}')
+            for spec in nested.spec_dirs:
+                merged_specs.add(f'{rel_dir_str}/{spec}')
+        except Exception:
+            pass  # Skip malformed configs
 
     return TallyConfig(excluded_dirs=merged_excluded, spec_dirs=merged_specs)
 
@@ -2,11 +2,35 @@
 
 from __future__ import annotations
 
+import functools
+import itertools
+import os
+import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
 from tallyman.languages import Language
 
+# A line holding nothing but whitespace, including its terminating newline.
+_BLANK_LINE_RE = re.compile(rb'^[^\S\n]*\n', re.MULTILINE)
+# Whitespace-only text with no newline, for an unterminated final line.
+_BLANK_TAIL_RE = re.compile(rb'[^\S\n]*')
+# Bytes the regexes above would read differently from str.splitlines()/str.strip():
+# the other line breaks (\v, \f, \x1c-\x1e, NEL, U+2028/9) and whitespace beyond
+# ASCII space and tab (\x1f, NBSP and the other UTF-8 encoded Unicode spaces).
+_ASCII_TEXT_ONLY_RE = re.compile(rb'[\v\f\x1c-\x1f]')
+_TEXT_ONLY_RE = re.compile(
+    rb'[\v\f\x1c-\x1f]|\xc2[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80'
+)
+
+PARALLEL_THRESHOLD = 200  # Below this many files, process pool startup costs more than it saves
+FILES_PER_WORKER = 200  # Pool size is capped so each worker process gets at least this many files
+STREAM_THRESHOLD = 4 * 1024 * 1024  # Files larger than this are counted in chunks
+STREAM_CHUNK_SIZE = 1024 * 1024
+
 
 @dataclass(slots=True)
 class FileCount:
@@ -16,6 +40,79 @@ class FileCount:
     blank_lines: int = 0
 
 
+@functools.cache
+def _line_pattern(marker: str) -> re.Pattern[bytes]:
+    """Compile a bytes regex that classifies blank and comment lines in one pass.
+
+    Each match captures either the newline of a whitespace-only line or
+    *marker* at the start of a comment line; code lines do not match.
+    """
+    return re.compile(rb'^[^\S\n]*(\n|' + re.escape(marker.encode()) + rb')', re.MULTILINE)
+
+
+def _classify_text(text: str, marker: str | None) -> tuple[int, int, int]:
+    """Return (total, blank, comment) line counts by splitting and stripping decoded text."""
+    lines = text.splitlines()
+    blank = comment = 0
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            blank += 1
+        elif marker is not None and stripped.startswith(marker):
+            comment += 1
+    return len(lines), blank, comment
+
+
+def _classify(data: bytes, marker: str | None) -> tuple[int, int, int]:
+    """Return (total, blank, comment) line counts for a block of file bytes.
+
+    Counts match decoding the block and using str.splitlines()/str.strip().
+    ``\\r\\n`` and lone ``\\r`` are folded to ``\\n``; blocks holding any other
+    line break or non-ASCII whitespace are classified from decoded text.
+    """
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    if (_ASCII_TEXT_ONLY_RE if data.isascii() else _TEXT_ONLY_RE).search(data):
+        return _classify_text(data.decode('utf-8', errors='replace'), marker)
+
+    total = data.count(b'\n')
+    comment = 0
+    if marker is None:
+        blank = len(_BLANK_LINE_RE.findall(data))
+    else:
+        matches = _line_pattern(marker).findall(data)
+        blank = matches.count(b'\n')
+        comment = len(matches) - blank
+
+    # The final line has no newline to anchor on; classify it separately
+    if data and not data.endswith(b'\n'):
+        total += 1
+        if _BLANK_TAIL_RE.fullmatch(data, data.rfind(b'\n') + 1):
+            blank += 1
+
+    return total, blank, comment
+
+
+def _read_line_blocks(f: BinaryIO) -> Iterator[bytes]:
+    """Yield the contents of *f* in chunks cut at newline boundaries.
+
+    Every block but the last ends with a newline, so no line is split
+    across two blocks. Partial lines are buffered in a bytearray, which keeps
+    very long lines linear to read.
+    """
+    carry = bytearray()
+    for chunk in iter(functools.partial(f.read, STREAM_CHUNK_SIZE), b''):
+        cut = chunk.rfind(b'\n') + 1
+        if not cut:
+            carry += chunk
+            continue
+        carry += chunk[:cut]
+        yield bytes(carry)
+        carry = bytearray(chunk[cut:])
+    if carry:
+        yield bytes(carry)
+
+
 def count_lines(path: Path, language: Language) -> FileCount:
     """Read a file and classify each line as blank, comment, or code.
 
@@ -23,25 +120,66 @@ def count_lines(path: Path, language: Language) -> FileCount:
     the stripped line starts with that marker. For languages without one,
     comment_lines stays 0  -  we only distinguish blank from non-blank.
 
-    Encoding errors are replaced to avoid crashes on non-UTF-8 files.
+    Counts follow str.splitlines()/str.strip() on the decoded file. Most
+    files take a byte-level fast path: ``\\r\\n`` and lone ``\\r`` are folded
+    to ``\\n`` and lines are classified by regex without decoding. Blocks
+    holding other line breaks (\\v, \\f, NEL, U+2028, ...) or non-ASCII
+    whitespace are decoded and split instead. Files larger than
+    STREAM_THRESHOLD are read in chunks to bound memory per worker.
     """
-    counts = FileCount()
-    comment_marker = language.single_line_comment
+    marker = language.single_line_comment
+    total = blank = comment = 0
 
     try:
-        text = path.read_text(encoding='utf-8', errors='replace')
+        with path.open('rb') as f:
+            if os.fstat(f.fileno()).st_size <= STREAM_THRESHOLD:
+                blocks: Iterable[bytes] = [f.read()]
+            else:
+                blocks = _read_line_blocks(f)
+            for block in blocks:
+                block_total, block_blank, block_comment = _classify(block, marker)
+                total += block_total
+                blank += block_blank
+                comment += block_comment
     except OSError:
-        return counts
+        return FileCount()
 
-    for line in text.splitlines():
-        counts.total_lines += 1
-        stripped = line.strip()
+    return FileCount(total, total - blank - comment, comment, blank)
 
-        if not stripped:
-            counts.blank_lines += 1
-        elif comment_marker is not None and stripped.startswith(comment_marker):
-            counts.comment_lines += 1
-        else:
-            counts.code_lines += 1
 
-    return counts
+def count_files(
+    files: Iterable[tuple[Path, Language]], jobs: int | None = None
+) -> Iterator[tuple[Language, FileCount]]:
+    """Count every file in *files*, yielding (Language, FileCount) pairs in input order.
+
+    Results stream out as they are produced so callers can reduce them
+    without holding every FileCount at once. Once more than
+    PARALLEL_THRESHOLD files arrive, counting moves to a process pool of up
+    to *jobs* workers (default: one per CPU), with no more workers than
+    FILES_PER_WORKER files each. Smaller inputs, or ``jobs=1``, are counted
+    serially since pool startup would dominate.
+    """
+    workers = jobs or os.cpu_count() or 1
+    files = iter(files)
+    head = list(itertools.islice(files, PARALLEL_THRESHOLD + 1)) if workers > 1 else []
+
+    if len(head) <= PARALLEL_THRESHOLD:
+        for path, language in itertools.chain(head, files):
+            yield language, count_lines(path, language)
+        return
+
+    # The pool submits every task up front, so the remaining input is materialised here
+    head.extend(files)
+    workers = min(workers, len(head) // FILES_PER_WORKER)
+    if workers <= 1:
+        for path, language in head:
+            yield language, count_lines(path, language)
+        return
+
+    paths = [path for path, _ in head]
+    languages = [language for _, language in head]
+    chunksize = max(1, len(head) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        counts = executor.map(count_lines, paths, languages, chunksize=chunksize)
+        # Pair with the caller's Language objects rather than the workers' unpickled copies
+        yield from zip(languages, counts)
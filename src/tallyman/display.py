@@ -2,13 +2,15 @@
 
 from __future__ import annotations
 
+import functools
 import sys
+from operator import attrgetter
 
 from rich.console import Console
 from rich.text import Text
 
 from tallyman import __version__
-from tallyman.aggregator import CATEGORY_DISPLAY_NAMES, TallyResult, language_percentages
+from tallyman.aggregator import CATEGORY_DISPLAY_NAMES, TallyResult
 from tallyman.languages import Language
 
 
@@ -31,37 +33,45 @@ HORIZONTAL_RULE = '─' if _USE_UNICODE else '-'
 BLOCK_CHAR = '█' if _USE_UNICODE else '#'
 
 BAR_WIDTH = 60
+SECTION_WIDTH = 58
 SMALL_LANGUAGE_THRESHOLD = 2.0  # Percentage below which languages are grouped as "Other"
 
+# Precomputed once at import; the encoding probe above never changes mid-run
+_SEP_LINE = HORIZONTAL_RULE * SECTION_WIDTH
+_BLOCKS = [BLOCK_CHAR * i for i in range(BAR_WIDTH + 1)]
 
-def display_results(result: TallyResult, directory: str, no_color: bool = False) -> None:
-    """Render the full tallyman output to the terminal."""
-    console = Console(no_color=no_color, highlight=False)
 
-    _display_report_header(console, directory)
+def display_results(result: TallyResult, directory: str, no_color: bool = False) -> None:
+    """Render the full tallyman output to the terminal.
 
-    if not result.by_language:
-        console.print('[dim]No recognized source files found.[/dim]')
-        return
+    The console's buffer context collects every print and writes the report
+    to stdout in one go rather than once per line.
+    """
+    console = Console(no_color=no_color, highlight=False)
 
-    display_names = _language_display_names(result)
+    with console:
+        _display_report_header(console, directory)
 
-    _display_languages(console, result, display_names)
-    _display_separator(console)
-    _display_category_totals(console, result)
-    _display_percentage_bar(console, result, display_names)
+        if not result.by_language:
+            console.print('[dim]No recognized source files found.[/dim]')
+            return
 
+        display_names = _language_display_names(result)
 
-SECTION_WIDTH = 58
+        _display_languages(console, result, display_names)
+        _display_separator(console)
+        _display_category_totals(console, result)
+        _display_percentage_bar(console, result, display_names)
 
 
 def _display_report_header(console: Console, directory: str) -> None:
-    console.print(f'[dim]{HORIZONTAL_RULE * SECTION_WIDTH}[/dim]')
+    console.print(f'[dim]{_SEP_LINE}[/dim]')
     console.print(f'[bold]Tallyman [dim]v{__version__} created by Michael Kennedy[/dim][/bold]')
     console.print(f'{directory}')
     console.print('')
 
 
+@functools.cache
 def _language_header(name: str, color: str) -> str:
     """Build a centered header like: ────────────  Python  ────────────"""
     label = f'  {name}  '
@@ -73,17 +83,19 @@ def _language_header(name: str, color: str) -> str:
 
 def _language_display_names(result: TallyResult) -> dict[Language, str]:
     """Build display names, appending category when a language name appears in multiple categories."""
-    name_categories: dict[str, set[str]] = {}
+    # aggregate() gives one row per (name, category), so a name with several rows spans categories
+    by_name: dict[str, list[Language]] = {}
     for stats in result.by_language:
-        name_categories.setdefault(stats.language.name, set()).add(stats.language.category)
+        by_name.setdefault(stats.language.name, []).append(stats.language)
 
     display_names: dict[Language, str] = {}
-    for stats in result.by_language:
-        if len(name_categories[stats.language.name]) > 1:
-            cat_label = CATEGORY_DISPLAY_NAMES.get(stats.language.category, stats.language.category)
-            display_names[stats.language] = f'{stats.language.name} ({cat_label.lower()})'
-        else:
-            display_names[stats.language] = stats.language.name
+    for name, langs in by_name.items():
+        if len(langs) == 1:
+            display_names[langs[0]] = name
+            continue
+        for lang in langs:
+            cat_label = CATEGORY_DISPLAY_NAMES.get(lang.category, lang.category)
+            display_names[lang] = f'{name} ({cat_label.lower()})'
     return display_names
 
 
@@ -96,8 +108,8 @@ def _display_languages(console: Console, result: TallyResult, display_names: dic
 
         total_str = f'{stats.total_lines:,}'
 
-        if lang.single_line_comment is not None:
-            effective_str = f'{stats.non_blank_non_comment:,}'
+        if lang.has_comment_marker:
+            effective_str = f'{stats.code_lines:,}'
             console.print(f'  {total_str:>10} lines of code')
             console.print(f'  {effective_str:>10} excluding comments and blank lines')
         else:
@@ -107,13 +119,13 @@ def _display_languages(console: Console, result: TallyResult, display_names: dic
 
 
 def _display_separator(console: Console) -> None:
-    console.print(f'[dim]{HORIZONTAL_RULE * SECTION_WIDTH}[/dim]')
+    console.print(f'[dim]{_SEP_LINE}[/dim]')
 
 
 def _display_category_totals(console: Console, result: TallyResult) -> None:
     active_categories = sorted(
         (c for c in result.by_category if c.total_lines > 0),
-        key=lambda c: c.effective_lines,
+        key=attrgetter('effective_lines'),
         reverse=True,
     )
     if not active_categories:
@@ -143,28 +155,39 @@ def _display_percentage_bar(console: Console, result: TallyResult, display_names
 
     console.print()
 
-    percentages = language_percentages(result)
+    # A single language fills the whole bar; skip the segment geometry
+    if len(result.by_language) == 1:
+        lang = result.by_language[0].language
+        console.print('  ', end='')
+        console.print(Text(_BLOCKS[BAR_WIDTH], style=lang.color))
+        console.print(f'  [{lang.color}]{display_names.get(lang, lang.name)}[/{lang.color}] 100%')
+        return
 
-    # Group small languages into "Other"
-    main_langs: list[tuple[Language | None, float]] = [
-        (lang, pct) for lang, pct in percentages if pct >= SMALL_LANGUAGE_THRESHOLD
-    ]
-    other_pct = sum(pct for _, pct in percentages if pct < SMALL_LANGUAGE_THRESHOLD)
-    if other_pct > 0:
-        main_langs.append((None, other_pct))
+    grand_total = result.grand_total_lines
+
+    # Group small languages into "Other", working in raw line counts
+    main_langs: list[tuple[Language | None, int]] = []
+    other_lines = 0
+    for stats in result.by_language:
+        if stats.total_lines * 100 >= SMALL_LANGUAGE_THRESHOLD * grand_total:
+            main_langs.append((stats.language, stats.total_lines))
+        else:
+            other_lines += stats.total_lines
+    if other_lines > 0:
+        main_langs.append((None, other_lines))
 
-    # Build the colored bar
+    # Build the colored bar; segment widths use integer half-up rounding
     bar = Text()
     chars_used = 0
-    for i, (lang, pct) in enumerate(main_langs):
+    for i, (lang, lines) in enumerate(main_langs):
         color = lang.color if lang else 'grey50'
         if i == len(main_langs) - 1:
             segment_width = BAR_WIDTH - chars_used
         else:
-            segment_width = max(1, round(pct / 100 * BAR_WIDTH))
+            segment_width = max(1, (lines * BAR_WIDTH + grand_total // 2) // grand_total)
             segment_width = min(segment_width, BAR_WIDTH - chars_used)
         if segment_width > 0:
-            bar.append(BLOCK_CHAR * segment_width, style=color)
+            bar.append(_BLOCKS[segment_width], style=color)
             chars_used += segment_width
 
     console.print('  ', end='')
@@ -172,7 +195,8 @@ def _display_percentage_bar(console: Console, result: TallyResult, display_names
 
     # Legend line
     legend_parts = []
-    for lang, pct in main_langs:
+    for lang, lines in main_langs:
+        pct = lines / grand_total * 100
         if lang is None:
             legend_parts.append(f'[grey50]Other[/grey50] {pct:.0f}%')
         else:
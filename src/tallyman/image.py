@@ -1,14 +1,27 @@
-"""Generate PNG summary card from tallyman results."""
+"""Generate PNG summary card from tallyman results.
+
+Pillow is imported at module scope; cli imports this module lazily, so it is
+only loaded when an image is requested.
+"""
 
 from __future__ import annotations
 
+import functools
+import itertools
+import os
 import re
 from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
 
+from PIL import Image, ImageDraw, ImageFont
+from rich.color import Color, ColorParseError
+
 from tallyman import __version__
-from tallyman.aggregator import TallyResult, language_percentages
+from tallyman.aggregator import CategoryStats, TallyResult, language_percentages
 from tallyman.display import _language_display_names
+from tallyman.fonts import JETBRAINS_MONO_BOLD, JETBRAINS_MONO_REGULAR
+from tallyman.languages import Language
 
 IMAGE_WIDTH = 1200
 PADDING = 60
@@ -22,6 +35,8 @@ BAR_GAP = 2  # px gap between bar segments (filled with background)
 SMALL_LANGUAGE_THRESHOLD = 2.0
 MAX_LEGEND_ITEMS = 5  # show at most this many languages; remainder grouped as "Other"
 
+_SLUG_SEPARATOR_RE = re.compile(r'[^a-z0-9]+')
+
 
 @dataclass(slots=True)
 class ImageTheme:
@@ -34,6 +49,7 @@ class ImageTheme:
     attribution: str
 
 
+@functools.cache
 def _hex_to_rgb(hex_str: str) -> tuple[int, int, int]:
     """Convert '#rrggbb' to (r, g, b)."""
     hex_str = hex_str.lstrip('#')
@@ -57,14 +73,13 @@ LIGHT_THEME = ImageTheme(
 )
 
 
+@functools.cache
 def _rich_color_to_rgb(name: str) -> tuple[int, int, int]:
     """Convert Rich color name to (r, g, b) for Pillow.
 
     Falls back to medium grey if the color name is not recognised by Rich,
     so an invalid colour in the language registry never crashes the whole run.
     """
-    from rich.color import Color, ColorParseError
-
     try:
         color = Color.parse(name)
     except ColorParseError:
@@ -73,12 +88,9 @@ def _rich_color_to_rgb(name: str) -> tuple[int, int, int]:
     return (triplet.red, triplet.green, triplet.blue)
 
 
+@functools.cache
 def _load_font(size: int, bold: bool = False):
     """Load monospace font: bundled JetBrains Mono, then system fallbacks."""
-    from PIL import ImageFont
-
-    from tallyman.fonts import JETBRAINS_MONO_BOLD, JETBRAINS_MONO_REGULAR
-
     path = JETBRAINS_MONO_BOLD if bold else JETBRAINS_MONO_REGULAR
     if path.exists():
         return ImageFont.truetype(str(path), size)
@@ -96,22 +108,13 @@ def _load_font(size: int, bold: bool = False):
     return ImageFont.load_default()
 
 
-def _cap_legend(
-    main_langs: list[tuple],
-    display_names: dict,
-) -> list[str]:
+def _cap_legend(legend_rows: list[tuple[str | None, float, tuple[int, int, int]]]) -> list[str]:
     """Build legend parts, capping at MAX_LEGEND_ITEMS and grouping the rest as 'Other'."""
-    legend_parts: list[str] = []
-    overflow_pct = 0.0
-    for i, (lang, pct) in enumerate(main_langs):
-        if i >= MAX_LEGEND_ITEMS:
-            overflow_pct += pct
-            continue
-        if lang is None:
-            overflow_pct += pct
-        else:
-            name = display_names.get(lang, lang.name)
-            legend_parts.append(f'{name} {pct:.0f}%')
+    head = legend_rows[:MAX_LEGEND_ITEMS]
+    legend_parts = [f'{name} {pct:.0f}%' for name, pct, _ in head if name is not None]
+    # Languages past the cap fold into 'Other', along with any small-language bucket (name None)
+    overflow_pct = sum(pct for _, pct, _ in legend_rows[MAX_LEGEND_ITEMS:])
+    overflow_pct += sum(pct for name, pct, _ in head if name is None)
     if overflow_pct > 0:
         legend_parts.append(f'Other {overflow_pct:.0f}%')
     return legend_parts
@@ -123,8 +126,7 @@ def generate_image(
     output_path: Path,
     theme: ImageTheme,
 ) -> None:
-    """Render tallyman summary to a PNG file. Pillow imported lazily on first use."""
-    from PIL import Image, ImageDraw
+    """Render tallyman summary to a PNG file."""
 
     bg_rgb = _hex_to_rgb(theme.background)
     text_rgb = _hex_to_rgb(theme.text)
@@ -137,24 +139,41 @@ def generate_image(
     font_attr = _load_font(14, bold=False)
 
     # Compute height: title + spacing + category lines + combined + bar + legend + attribution
-    active_categories = sorted(
-        (c for c in result.by_category if c.total_lines > 0),
-        key=lambda c: c.effective_lines,
-        reverse=True,
-    )
+    active_categories: list[CategoryStats] = []
+    combined = 0
+    for cat in result.by_category:
+        if cat.total_lines > 0:
+            active_categories.append(cat)
+            combined += cat.effective_lines
+    active_categories.sort(key=attrgetter('effective_lines'), reverse=True)
     num_category_lines = len(active_categories) + 1 if active_categories else 0  # +1 for Combined
     has_bar = result.grand_total_lines > 0
     percentages = language_percentages(result) if has_bar else []
-    main_langs = [(lang, pct) for lang, pct in percentages if pct >= SMALL_LANGUAGE_THRESHOLD]
-    other_pct = sum(pct for _, pct in percentages if pct < SMALL_LANGUAGE_THRESHOLD)
+    # (language or None for Other, percentage, line count); lines give the bar exact integer widths
+    main_langs: list[tuple[Language | None, float, int]] = []
+    other_pct = 0.0
+    other_lines = 0
+    for stats, (lang, pct) in zip(result.by_language, percentages):
+        if pct >= SMALL_LANGUAGE_THRESHOLD:
+            main_langs.append((lang, pct, stats.total_lines))
+        else:
+            other_pct += pct
+            other_lines += stats.total_lines
     if other_pct > 0:
-        main_langs.append((None, other_pct))
+        main_langs.append((None, other_pct, other_lines))
 
-    # Pre-compute legend parts (capped at MAX_LEGEND_ITEMS + Other)
-    display_names = _language_display_names(result) if result.by_language else {}
+    # Resolve each bar segment's display name and color once, for both the bar and legend
+    legend_rows: list[tuple[str | None, float, tuple[int, int, int]]] = []
     legend_parts: list[str] = []
     if has_bar and main_langs:
-        legend_parts = _cap_legend(main_langs, display_names)
+        display_names = _language_display_names(result)
+        legend_rows = [
+            (display_names.get(lang, lang.name), pct, _rich_color_to_rgb(lang.color))
+            if lang is not None
+            else (None, pct, _rich_color_to_rgb('grey50'))
+            for lang, pct, _ in main_langs
+        ]
+        legend_parts = _cap_legend(legend_rows)
 
     content_lines = 1 + num_category_lines + 1  # title, categories, attribution
     if not result.by_language:
@@ -181,13 +200,15 @@ def generate_image(
         # Category totals
         max_name_len = max((len(c.name) for c in active_categories), default=0)
         max_name_len = max(max_name_len, len('Combined'))
+        name_width = max_name_len + 1
 
         for cat in active_categories:
             if len(cat.languages) <= 3:
                 lang_list = ' + '.join(cat.languages)
             else:
                 lang_list = ' + '.join(cat.languages[:3]) + ', etc'
-            line = f'{cat.name}:'.ljust(max_name_len + 1) + f'{cat.effective_lines:>10,} lines ({lang_list})'
+            label = f'{cat.name}:'
+            line = f'{label:<{name_width}}{cat.effective_lines:>10,} lines ({lang_list})'
             draw.text((PADDING, y), line, font=font_body, fill=text_rgb)
             y += LINE_HEIGHT
 
@@ -197,8 +218,7 @@ def generate_image(
             draw.line((PADDING, y, IMAGE_WIDTH - PADDING, y), fill=dim_rgb, width=1)
             y += 10
 
-            combined = sum(c.effective_lines for c in active_categories)
-            total_line = 'Total:'.ljust(max_name_len + 1) + f'{combined:>10,} lines'
+            total_line = f'{"Total:":<{name_width}}{combined:>10,} lines'
             draw.text((PADDING, y), total_line, font=font_body, fill=text_rgb)
             y += LINE_HEIGHT
 
@@ -210,21 +230,24 @@ def generate_image(
             bar_top = y
             bar_bottom = y + BAR_HEIGHT
             total_width = bar_right - bar_left
-            x = bar_left
-            for i, (lang, pct) in enumerate(main_langs):
-                if pct <= 0:
-                    continue
-                if i == len(main_langs) - 1:
-                    seg_right = bar_right
-                else:
-                    segment_width = max(4, int(total_width * pct / 100))
-                    segment_width = min(segment_width, bar_right - x)
-                    seg_right = x + segment_width
-                if seg_right <= x:
-                    continue
-                rgb = _rich_color_to_rgb(lang.color) if lang is not None else _rich_color_to_rgb('grey50')
-                draw.rectangle((x, bar_top, seg_right - BAR_GAP, bar_bottom), fill=rgb)
-                x = seg_right
+
+            # Lay the segments out on a single background-colored scanline, then
+            # stretch it to the bar height and paste it in one operation
+            row = bytearray(bytes(bg_rgb) * total_width)
+            # Segment edges in whole pixels, from each segment's share of the line counts:
+            # each segment is at least 4px wide and the last one runs to the end of the bar
+            grand_total = result.grand_total_lines
+            widths = [max(4, total_width * lines // grand_total) if lines > 0 else 0 for _, _, lines in main_langs]
+            edges = [min(edge, total_width) for edge in itertools.accumulate(widths, initial=0)]
+            edges[-1] = total_width
+            for (_, _, rgb), start, seg_right in zip(legend_rows, edges, edges[1:]):
+                end = seg_right - BAR_GAP + 1  # exclusive; leaves BAR_GAP - 1 px of background
+                if end > start:
+                    row[start * 3 : end * 3] = bytes(rgb) * (end - start)
+            strip = Image.frombytes('RGB', (total_width, 1), bytes(row))
+            img.paste(
+                strip.resize((total_width, bar_bottom - bar_top + 1), Image.Resampling.NEAREST), (bar_left, bar_top)
+            )
             y = bar_bottom + 12
 
             # Legend -- single line, capped to MAX_LEGEND_ITEMS + Other
@@ -249,28 +272,28 @@ def generate_image(
 
 def slugify_directory_name(name: str) -> str:
     """Convert directory name to URL-slug style for filename."""
-    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+    slug = _SLUG_SEPARATOR_RE.sub('-', name.lower()).strip('-')
     return slug or 'tallyman-report'
 
 
+@functools.cache
+def _desktop_dir() -> Path | None:
+    """Return the user's Desktop directory, or None if there isn't one."""
+    desktop = Path.home() / 'Desktop'
+    return desktop if desktop.is_dir() else None
+
+
 def resolve_image_path(directory_name: str, desktop_preferred: bool = True) -> Path:
     """Resolve output path: Desktop (or cwd) + slugified name + numeric suffix if exists."""
-    if desktop_preferred:
-        desktop = Path.home() / 'Desktop'
-        if desktop.is_dir():
-            base_dir = desktop
-        else:
-            base_dir = Path.cwd()
-    else:
-        base_dir = Path.cwd()
+    base_dir = (_desktop_dir() if desktop_preferred else None) or Path.cwd()
 
     slug = slugify_directory_name(directory_name)
-    candidate = base_dir / f'{slug}.png'
-    if not candidate.exists():
-        return candidate
+    # One directory listing instead of a stat per candidate name
+    with os.scandir(base_dir) as entries:
+        existing = {entry.name for entry in entries if entry.name.startswith(slug)}
+    if f'{slug}.png' not in existing:
+        return base_dir / f'{slug}.png'
     n = 1
-    while True:
-        candidate = base_dir / f'{slug}-{n}.png'
-        if not candidate.exists():
-            return candidate
+    while f'{slug}-{n}.png' in existing:
         n += 1
+    return base_dir / f'{slug}-{n}.png'
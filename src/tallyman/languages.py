@@ -3,17 +3,33 @@
 from __future__ import annotations
 
 import functools
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, eq=False)
 class Language:
     name: str
     category: str  # 'code', 'devops', 'design', 'docs', 'data'
     color: str  # Rich color name
     single_line_comment: str | None  # e.g. '#', '//', '--'; None if no simple detection
     extensions: tuple[str, ...]
+    # Derived once at construction so hot paths skip the None comparison
+    has_comment_marker: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'has_comment_marker', self.single_line_comment is not None)
+
+    # Identity is (name, category): names are unique in the registry, and the
+    # category tells a docs language apart from its as_spec() variant. Hashing
+    # two strings avoids rehashing the extensions tuple on every dict lookup.
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Language):
+            return NotImplemented
+        return self.name == other.name and self.category == other.category
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.category))
 
 
 # fmt: off
@@ -69,35 +85,22 @@ LANGUAGES: tuple[Language, ...] = (
 # fmt: on
 
 
-def _build_extension_map() -> dict[str, Language]:
-    ext_map: dict[str, Language] = {}
-    for lang in LANGUAGES:
-        for ext in lang.extensions:
-            ext_map[ext] = lang
-    return ext_map
-
-
-EXTENSION_MAP: dict[str, Language] = _build_extension_map()
-
+EXTENSION_MAP: dict[str, Language] = {ext: lang for lang in LANGUAGES for ext in lang.extensions}
 
-def _build_filename_map() -> dict[str, Language]:
-    """Map specific filenames to languages for files identified by name rather than extension."""
-    by_name = {lang.name: lang for lang in LANGUAGES}
-    docker = by_name['Docker']
-    makefile = by_name['Makefile']
-    return {
-        'Dockerfile': docker,
-        'Makefile': makefile,
-        'makefile': makefile,
-        'GNUmakefile': makefile,
-        'docker-compose.yml': docker,
-        'docker-compose.yaml': docker,
-        'compose.yml': docker,
-        'compose.yaml': docker,
-    }
+# Languages identified by filename rather than extension
+_DOCKER = next(lang for lang in LANGUAGES if lang.name == 'Docker')
+_MAKEFILE = next(lang for lang in LANGUAGES if lang.name == 'Makefile')
 
-
-FILENAME_MAP: dict[str, Language] = _build_filename_map()
+FILENAME_MAP: dict[str, Language] = {
+    'Dockerfile': _DOCKER,
+    'Makefile': _MAKEFILE,
+    'makefile': _MAKEFILE,
+    'GNUmakefile': _MAKEFILE,
+    'docker-compose.yml': _DOCKER,
+    'docker-compose.yaml': _DOCKER,
+    'compose.yml': _DOCKER,
+    'compose.yaml': _DOCKER,
+}
 
 
 def identify_language(path: Path) -> Language | None:
@@ -107,12 +110,27 @@ def identify_language(path: Path) -> Language | None:
     then Dockerfile prefix variants (Dockerfile.dev, Dockerfile.prod),
     then falls back to extension matching.
     """
-    name = path.name
-    if name in FILENAME_MAP:
-        return FILENAME_MAP[name]
+    return identify_filename(path.name)
+
+
+def identify_filename(name: str) -> Language | None:
+    """Return the Language for a bare file name, or None if unrecognized.
+
+    Same rules as identify_language, for callers that already hold the name
+    as a string and would otherwise build a Path just to look it up.
+    """
+    lang = FILENAME_MAP.get(name)
+    if lang is not None:
+        return lang
     if name.startswith('Dockerfile'):
-        return FILENAME_MAP['Dockerfile']
-    return EXTENSION_MAP.get(path.suffix.lower())
+        return _DOCKER
+    # Slice the suffix directly (same rule as PurePath.suffix) rather than via splitext
+    dot = name.rfind('.')
+    if dot <= 0 or dot == len(name) - 1:
+        return None
+    suffix = name[dot:]
+    # Most suffixes are already lowercase; only fold case on a miss
+    return EXTENSION_MAP.get(suffix) or EXTENSION_MAP.get(suffix.lower())
 
 
 @functools.cache
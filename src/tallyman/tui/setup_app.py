@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from textual.app import App, ComposeResult
@@ -10,7 +11,7 @@ from textual.containers import Horizontal
 from textual.widgets import Button, Footer, Header, Static, Tree
 from textual.widgets.tree import TreeNode
 
-from tallyman.walker import SPEC_DIR_NAMES, GitIgnoreSpec
+from tallyman.walker import SPEC_DIR_NAMES, GitIgnoreSpec, NestedIgnores
 
 
 class SetupTree(Tree[dict[str, object]]):
@@ -76,11 +77,11 @@ class SetupApp(App[tuple[set[str], set[str]] | None]):
             'excluded': False,
             'spec': False,
             'auto_spec': False,
+            'pending': False,
+            'nested': NestedIgnores(),
         }
         self._populate(tree.root, self.root, '')
-        tree.root.expand_all()
-        if self.user_excluded:
-            self._collapse_excluded(tree.root)
+        tree.root.expand()
         tree.show_root = True
         yield tree
         with Horizontal(id='buttons'):
@@ -91,29 +92,52 @@ class SetupApp(App[tuple[set[str], set[str]] | None]):
     def _populate(
         self,
         parent_node: TreeNode[dict[str, object]],
-        dir_path: Path,
+        dir_path: str | Path,
         rel_path: str,
         parent_is_spec: bool = False,
+        parent_excluded: bool = False,
+        nested: NestedIgnores = NestedIgnores(),
     ) -> None:
-        """Recursively add subdirectories to the tree."""
+        """Recursively add subdirectories to the tree.
+
+        Uses os.scandir so directory checks come from the cached entry type
+        rather than a fresh stat per child, and recurses on the entry's str
+        path without building a Path per directory. Excluded directories start
+        collapsed and are only read once the user expands them
+        (see on_tree_node_expanded). A ``.gitignore`` below the root applies to
+        everything beneath its directory, as in the walker.
+        """
         try:
-            entries = sorted(dir_path.iterdir(), key=lambda p: p.name.lower())
+            with os.scandir(dir_path) as it:
+                scanned = list(it)
         except PermissionError:
             return
 
-        for entry in entries:
-            if not entry.is_dir(follow_symlinks=False) or entry.name.startswith('.'):
-                continue
+        if rel_path:
+            for e in scanned:
+                if e.name == '.gitignore' and e.is_file():
+                    nested = nested.with_file(rel_path, e.path)
+                    break
+
+        # Drop hidden entries and non-directories before sorting
+        entries = sorted(
+            (e for e in scanned if not e.name.startswith('.') and e.is_dir(follow_symlinks=False)),
+            key=lambda e: e.name.lower(),
+        )
 
-            child_rel = f'{rel_path}/{entry.name}'.lstrip('/')
-            is_gitignored = self.gitignore_spec.match_file(child_rel + '/')
-            is_excluded = child_rel in self.user_excluded or is_gitignored
-            is_auto_spec = entry.name.lower() in SPEC_DIR_NAMES and not is_gitignored
+        for entry in entries:
+            name = entry.name
+            child_rel = f'{rel_path}/{name}' if rel_path else name
+            is_gitignored = nested.is_ignored(child_rel + '/', self.gitignore_spec)
+            is_excluded = parent_excluded or child_rel in self.user_excluded or is_gitignored
+            # Excluded subtrees are filled in on first expand rather than up front
+            is_pending = is_excluded and not is_gitignored
+            is_auto_spec = name.lower() in SPEC_DIR_NAMES and not is_gitignored
             inherited_spec = parent_is_spec and not is_gitignored
             is_spec = child_rel in self.user_spec_dirs or is_auto_spec or inherited_spec
             show_auto = is_auto_spec or inherited_spec
 
-            label = self._make_label(entry.name, is_gitignored, is_excluded, is_spec, show_auto)
+            label = self._make_label(name, is_gitignored, is_excluded, is_spec, show_auto)
             node = parent_node.add(
                 label,
                 data={
@@ -122,21 +146,31 @@ class SetupApp(App[tuple[set[str], set[str]] | None]):
                     'excluded': is_excluded,
                     'spec': is_spec,
                     'auto_spec': show_auto,
+                    'pending': is_pending,
+                    'nested': nested,
                 },
+                expand=not is_excluded,
             )
 
-            # Don't recurse into gitignored dirs
-            if not is_gitignored:
-                self._populate(node, entry, child_rel, parent_is_spec=is_spec)
+            # Don't recurse into gitignored or excluded dirs
+            if not is_excluded:
+                self._populate(node, entry.path, child_rel, parent_is_spec=is_spec, nested=nested)
 
-    @staticmethod
-    def _collapse_excluded(node: TreeNode[dict[str, object]]) -> None:
-        """Collapse nodes that are excluded so they start folded."""
-        for child in node.children:
-            if child.data and child.data.get('excluded'):
-                child.collapse()
-            else:
-                SetupApp._collapse_excluded(child)
+    def on_tree_node_expanded(self, event: Tree.NodeExpanded[dict[str, object]]) -> None:
+        """Read an excluded directory's children the first time it is expanded."""
+        node = event.node
+        if not node.data or not node.data.get('pending'):
+            return
+        node.data['pending'] = False
+        rel_path = str(node.data['path'])
+        self._populate(
+            node,
+            self.root / rel_path,
+            rel_path,
+            parent_is_spec=bool(node.data['spec']),
+            parent_excluded=bool(node.data['excluded']),
+            nested=node.data['nested'],  # type: ignore[arg-type]
+        )
 
     @staticmethod
     def _make_label(
@@ -203,59 +237,83 @@ class SetupApp(App[tuple[set[str], set[str]] | None]):
         node = tree.cursor_node
         if node is None:
             return
-        if not node.is_expanded and node.children:
+        if not node.is_expanded and (node.children or (node.data and node.data.get('pending'))):
             node.expand()
         elif node.is_expanded and node.children:
             tree.select_node(node.children[0])
 
     def _set_excluded(self, node: TreeNode[dict[str, object]], excluded: bool) -> None:
-        """Set excluded state on a node and cascade to all children."""
-        node.data['excluded'] = excluded  # type: ignore[index]
-        rel_path = str(node.data['path'])  # type: ignore[index]
-
-        if excluded:
-            self.user_excluded.add(rel_path)
-            # Clear spec status when excluding
-            node.data['spec'] = False  # type: ignore[index]
-            self.user_spec_dirs.discard(rel_path)
-        else:
-            self.user_excluded.discard(rel_path)
-
-        # Update label
-        name = Path(rel_path).name if rel_path else self.root.name
-        gitignored = bool(node.data['gitignored'])  # type: ignore[index]
-        auto_spec = bool(node.data['auto_spec'])  # type: ignore[index]
-        spec = bool(node.data['spec'])  # type: ignore[index]
-        node.set_label(self._make_label(name, gitignored, excluded, spec, auto_spec))
-
-        # Cascade to children
-        for child in node.children:
-            if child.data and not child.data['gitignored']:
-                self._set_excluded(child, excluded)
+        """Set excluded state on a node and cascade to all children.
+
+        Walks the subtree with an explicit stack, so deep trees cannot hit the
+        recursion limit, and batches the label changes into one screen update.
+        """
+        stack = [node]
+        with self.batch_update():
+            while stack:
+                current = stack.pop()
+                data: dict[str, object] = current.data  # type: ignore[assignment]
+                data['excluded'] = excluded
+                rel_path = str(data['path'])
+
+                if excluded:
+                    self.user_excluded.add(rel_path)
+                    # Clear spec status when excluding
+                    data['spec'] = False
+                    self.user_spec_dirs.discard(rel_path)
+                else:
+                    self.user_excluded.discard(rel_path)
+
+                # Update label
+                name = Path(rel_path).name if rel_path else self.root.name
+                gitignored = bool(data['gitignored'])
+                auto_spec = bool(data['auto_spec'])
+                spec = bool(data['spec'])
+                current.set_label(self._make_label(name, gitignored, excluded, spec, auto_spec))
+
+                if data['pending']:
+                    # Children not read yet: apply the cascade to their saved paths instead
+                    prefix = rel_path + '/'
+                    cascaded = self.user_spec_dirs if excluded else self.user_excluded
+                    cascaded.difference_update([p for p in cascaded if p.startswith(prefix)])
+
+                # Cascade to children
+                stack.extend(child for child in current.children if child.data and not child.data['gitignored'])
 
     def _set_spec(self, node: TreeNode[dict[str, object]], spec: bool) -> None:
-        """Set spec state on a node and cascade to all children."""
-        node.data['spec'] = spec  # type: ignore[index]
-        if not spec:
-            node.data['auto_spec'] = False  # type: ignore[index]
-        rel_path = str(node.data['path'])  # type: ignore[index]
-
-        if spec:
-            self.user_spec_dirs.add(rel_path)
-        else:
-            self.user_spec_dirs.discard(rel_path)
-
-        # Update label
-        name = Path(rel_path).name if rel_path else self.root.name
-        gitignored = bool(node.data['gitignored'])  # type: ignore[index]
-        excluded = bool(node.data['excluded'])  # type: ignore[index]
-        auto_spec = bool(node.data['auto_spec'])  # type: ignore[index]
-        node.set_label(self._make_label(name, gitignored, excluded, spec, auto_spec))
-
-        # Cascade to children
-        for child in node.children:
-            if child.data and not child.data['gitignored']:
-                self._set_spec(child, spec)
+        """Set spec state on a node and cascade to all children.
+
+        Like _set_excluded, walks iteratively and repaints once at the end.
+        """
+        stack = [node]
+        with self.batch_update():
+            while stack:
+                current = stack.pop()
+                data: dict[str, object] = current.data  # type: ignore[assignment]
+                data['spec'] = spec
+                if not spec:
+                    data['auto_spec'] = False
+                rel_path = str(data['path'])
+
+                if spec:
+                    self.user_spec_dirs.add(rel_path)
+                else:
+                    self.user_spec_dirs.discard(rel_path)
+
+                # Update label
+                name = Path(rel_path).name if rel_path else self.root.name
+                gitignored = bool(data['gitignored'])
+                excluded = bool(data['excluded'])
+                auto_spec = bool(data['auto_spec'])
+                current.set_label(self._make_label(name, gitignored, excluded, spec, auto_spec))
+
+                if data['pending'] and not spec:
+                    # Children not read yet: drop their saved spec paths instead
+                    prefix = rel_path + '/'
+                    self.user_spec_dirs.difference_update([p for p in self.user_spec_dirs if p.startswith(prefix)])
+
+                # Cascade to children
+                stack.extend(child for child in current.children if child.data and not child.data['gitignored'])
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == 'save':
@@ -267,12 +325,19 @@ class SetupApp(App[tuple[set[str], set[str]] | None]):
 
     @staticmethod
     def _clean_exclusions(excluded: set[str]) -> set[str]:
-        """Remove child paths when a parent is already excluded."""
-        sorted_paths = sorted(excluded)
+        """Remove child paths when a parent is already excluded.
+
+        Sorting by path components keeps every descendant directly after its
+        ancestor (plain string order would put ``a-b`` between ``a`` and
+        ``a/c``), so each path only needs checking against the last kept one.
+        """
         cleaned: set[str] = set()
-        for path in sorted_paths:
-            if not any(path.startswith(p + '/') for p in cleaned):
-                cleaned.add(path)
+        kept_prefix: str | None = None
+        for path in sorted(excluded, key=lambda p: p.split('/')):
+            if kept_prefix is not None and path.startswith(kept_prefix):
+                continue
+            cleaned.add(path)
+            kept_prefix = path + '/'
         return cleaned
 
 
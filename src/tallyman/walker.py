@@ -2,16 +2,26 @@
 
 from __future__ import annotations
 
+import functools
 import os
 from collections.abc import Iterator
+from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
 
 import pathspec
 
 from tallyman.config import CONFIG_FILENAME, load_config
-from tallyman.languages import Language, as_spec, identify_language
+from tallyman.languages import Language, as_spec, identify_filename
 
 SPEC_DIR_NAMES: frozenset[str] = frozenset({'specs', 'specifications', 'plans', 'agents'})
+MATCH_CACHE_SIZE = 8192  # Gitignore verdicts remembered per GitIgnoreSpec
+IGNORE_FILE_CACHE_SIZE = 1024  # Compiled .gitignore files remembered per process
+BINARY_SNIFF_BYTES = 512  # Leading bytes checked for NUL when detecting binary files
+# Categories whose files skip the NUL sniff, as their extensions are normally plain text
+TEXT_ONLY_CATEGORIES: frozenset[str] = frozenset({'code', 'devops', 'docs'})
+# Extensions in those categories that a binary format shares (.ts is also MPEG transport stream video)
+SNIFFED_TEXT_EXTENSIONS: frozenset[str] = frozenset({'.ts'})
 
 
 def find_git_root(start: Path) -> Path | None:
@@ -19,14 +29,18 @@ def find_git_root(start: Path) -> Path | None:
 
     Returns the git repo root, or None if not inside a git repository.
     """
-    current = start.resolve()
-    while True:
-        if (current / '.git').exists():
-            return current
-        parent = current.parent
-        if parent == current:
-            return None
-        current = parent
+    return _git_root_of(start.resolve())
+
+
+@functools.lru_cache(maxsize=128)
+def _git_root_of(current: Path) -> Path | None:
+    """find_git_root for an already-resolved path."""
+    if os.path.exists(os.path.join(current, '.git')):
+        return current
+    parent = current.parent
+    if parent == current:
+        return None
+    return _git_root_of(parent)
 
 
 class GitIgnoreSpec:
@@ -40,13 +54,45 @@ class GitIgnoreSpec:
     def __init__(self, spec: pathspec.PathSpec, prefix: str = '') -> None:
         self._spec = spec
         self._prefix = prefix
+        # Verdicts are memoised per instance: the setup TUI and the walker query the
+        # same directories, and pathspec checks every pattern on each call
+        self._match_full = functools.lru_cache(maxsize=MATCH_CACHE_SIZE)(spec.match_file)
 
     def match_file(self, path: str) -> bool:
         if self._prefix:
             full = f'{self._prefix}/{path}'
         else:
             full = path
-        return self._spec.match_file(full)
+        return self._match_full(full)
+
+
+def _read_ignore_lines(path: str | Path) -> list[str]:
+    """Return the lines of an ignore file, or [] if it is missing or unreadable.
+
+    Read as bytes and decoded once, skipping the text-layer newline translation;
+    str.splitlines still handles CRLF files.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+    return data.decode('utf-8', errors='replace').splitlines()
+
+
+@functools.lru_cache(maxsize=IGNORE_FILE_CACHE_SIZE)
+def _compile_ignore_file(path: str, mtime_ns: int, size: int) -> pathspec.PathSpec:
+    """Compile one ignore file; *mtime_ns* and *size* identify the version of the file that was read."""
+    return pathspec.PathSpec.from_lines('gitignore', _read_ignore_lines(path))  # type: ignore[arg-type]
+
+
+def _ignore_file_spec(path: str | Path) -> pathspec.PathSpec:
+    """Return the compiled patterns of one ignore file; a missing file ignores nothing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return pathspec.PathSpec([])
+    return _compile_ignore_file(os.fspath(path), st.st_mtime_ns, st.st_size)
 
 
 def load_gitignore(root: Path) -> GitIgnoreSpec:
@@ -57,47 +103,86 @@ def load_gitignore(root: Path) -> GitIgnoreSpec:
     - ``<git-root>/.git/info/exclude``
     - Any ``.gitignore`` in directories between the git root and *root*
     """
-    git_root = find_git_root(root)
-    lines: list[str] = []
+    resolved_root = root.resolve()
+    git_root = _git_root_of(resolved_root)
 
     if git_root is None:
         # Not in a git repo  -  just check for a local .gitignore
-        local_ignore = root / '.gitignore'
-        if local_ignore.is_file():
-            lines.extend(local_ignore.read_text(encoding='utf-8', errors='replace').splitlines())
-        return GitIgnoreSpec(pathspec.PathSpec.from_lines('gitignore', lines))  # type: ignore[arg-type]
+        return GitIgnoreSpec(_ignore_file_spec(root / '.gitignore'))
 
     # Load repo-root files
-    for ignore_file in [git_root / '.gitignore', git_root / '.git' / 'info' / 'exclude']:
-        if ignore_file.is_file():
-            lines.extend(ignore_file.read_text(encoding='utf-8', errors='replace').splitlines())
+    ignore_files = [git_root / '.gitignore', git_root / '.git' / 'info' / 'exclude']
 
     # Load intermediate .gitignore files between git root and analysis root
-    resolved_root = root.resolve()
+    prefix = ''
     if resolved_root != git_root:
         rel = resolved_root.relative_to(git_root)
+        # The path from git root to analysis root prefixes every match
+        prefix = rel.as_posix()
         current = git_root
         for part in rel.parts:
             current = current / part
-            ignore_file = current / '.gitignore'
-            if ignore_file.is_file():
-                lines.extend(ignore_file.read_text(encoding='utf-8', errors='replace').splitlines())
+            ignore_files.append(current / '.gitignore')
 
-    spec = pathspec.PathSpec.from_lines('gitignore', lines)  # type: ignore[arg-type]
+    # Each file is compiled (or fetched from cache) on its own; the patterns are then
+    # concatenated in order, which matches compiling all of the lines together
+    spec = pathspec.PathSpec([pattern for f in ignore_files for pattern in _ignore_file_spec(f).patterns])
+    return GitIgnoreSpec(spec, prefix)
 
-    # Compute the prefix: path from git root to analysis root
-    prefix = str(resolved_root.relative_to(git_root)) if resolved_root != git_root else ''
 
-    return GitIgnoreSpec(spec, prefix)
+@dataclass(frozen=True, slots=True)
+class NestedIgnores:
+    """``.gitignore`` files found inside a walked tree, each applying beneath its own directory.
+
+    Instances are immutable, so one directory's instance can be shared by all
+    of its subdirectories; ``with_file`` returns an extended copy.
+    """
+
+    specs: tuple[tuple[str, pathspec.PathSpec], ...] = ()  # (directory rel path, spec), innermost last
+
+    def with_file(self, rel_dir: str, path: str | Path) -> NestedIgnores:
+        """Return a copy that also applies the ignore file at *path*, found in directory *rel_dir*."""
+        return NestedIgnores((*self.specs, (rel_dir, _ignore_file_spec(path))))
 
+    def is_ignored(self, rel_path: str, gitignore_spec: GitIgnoreSpec) -> bool:
+        """Check *rel_path* against the nested files (innermost wins), then *gitignore_spec*."""
+        for base, spec in reversed(self.specs):
+            verdict = spec.check_file(rel_path[len(base) + 1 :]).include
+            if verdict is not None:
+                return verdict
+        return gitignore_spec.match_file(rel_path)
 
-def _is_binary(path: Path) -> bool:
-    """Return True if the file appears to be binary."""
+
+# Unbuffered read-only open for the binary sniff. O_NONBLOCK keeps a direct call on a FIFO
+# from hanging; O_BINARY stops Windows treating Ctrl-Z as end of file.
+_SNIFF_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_NONBLOCK', 0) | getattr(os, 'O_BINARY', 0)
+
+
+def _is_binary(path: str | Path) -> bool:
+    """Return True if the file appears to be binary (a NUL byte near the start)."""
+    try:
+        fd = os.open(path, _SNIFF_OPEN_FLAGS)
+    except OSError:
+        return True
     try:
-        chunk = path.read_bytes()[:8192]
-        return b'\x00' in chunk
+        chunk = os.read(fd, BINARY_SNIFF_BYTES)
     except OSError:
         return True
+    finally:
+        os.close(fd)
+    return b'\x00' in chunk
+
+
+def _needs_sniff(filename: str, language: Language) -> bool:
+    """Return True if *filename* must be checked for binary content before it is counted."""
+    if language.category not in TEXT_ONLY_CATEGORIES:
+        return True
+    return filename[filename.rfind('.') :].lower() in SNIFFED_TEXT_EXTENSIONS
+
+
+def _posix_rel(path: str) -> str:
+    """Return a configured relative directory path in the walker's '/'-separated form."""
+    return path.replace(os.sep, '/') if os.sep != '/' else path
 
 
 def walk_project(
@@ -108,6 +193,10 @@ def walk_project(
 ) -> Iterator[tuple[Path, Language]]:
     """Yield (file_path, language) for every countable source file under root.
 
+    Gitignore patterns from the repo root down to *root* come from
+    *gitignore_spec*; ``.gitignore`` files inside the tree are parsed as the
+    walk reaches them and apply only beneath their own directory.
+
     Args:
         root: Project root directory.
         excluded_dirs: Relative directory paths to skip (e.g. {'static/external'}).
@@ -117,78 +206,89 @@ def walk_project(
     if gitignore_spec is None:
         gitignore_spec = load_gitignore(root)
 
-    working_excluded = set(excluded_dirs)
-    active_spec_roots: set[str] = set(spec_dirs) if spec_dirs else set()
-
-    for dirpath_str, dirnames, filenames in os.walk(root, topdown=True, followlinks=False):
-        dirpath = Path(dirpath_str)
-        rel_dir = dirpath.relative_to(root)
-        rel_dir_str = str(rel_dir) if rel_dir.parts else ''
-
-        # Discover nested config files in subdirectories
+    # Relative paths are compared as '/'-separated strings; normalise configured ones once
+    working_excluded = {_posix_rel(p) for p in excluded_dirs}
+    active_spec_roots = {_posix_rel(p) for p in spec_dirs} if spec_dirs else set()
+
+    # Depth-first, pre-order like os.walk(topdown=True), but scandir's DirEntry
+    # answers is_dir()/is_symlink() from the directory listing, without an extra stat
+    stack: list[tuple[str, str, NestedIgnores, bool]] = [(os.fspath(root), '', NestedIgnores(), False)]
+    while stack:
+        dirpath, rel_dir_str, nested, parent_is_spec = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = sorted(it, key=attrgetter('name'))
+        except OSError:
+            continue
+
+        subdirs: list[os.DirEntry[str]] = []
+        files: list[os.DirEntry[str]] = []
+        for entry in entries:
+            if entry.is_dir():
+                # Hidden directories (e.g. .git, .venv) and symlinked ones are never entered
+                if not entry.name.startswith('.') and not entry.is_symlink():
+                    subdirs.append(entry)
+            elif entry.is_file():
+                # Regular files only: FIFOs, sockets and devices would block or fail when counted
+                files.append(entry)
+
+        # Discover nested config and .gitignore files in subdirectories
         if rel_dir_str:
-            config_file = dirpath / CONFIG_FILENAME
-            if config_file.is_file():
+            for entry in files:
+                if entry.name == '.gitignore':
+                    nested = nested.with_file(rel_dir_str, entry.path)
+                    continue
+                if entry.name != CONFIG_FILENAME:
+                    continue
                 try:
-                    nested_config = load_config(config_file)
+                    nested_config = load_config(Path(entry.path))
                     for excl in nested_config.excluded_dirs:
-                        working_excluded.add(f'{rel_dir_str}/{excl}')
+                        working_excluded.add(f'{rel_dir_str}/{_posix_rel(excl)}')
                     for spec in nested_config.spec_dirs:
-                        active_spec_roots.add(f'{rel_dir_str}/{spec}')
+                        active_spec_roots.add(f'{rel_dir_str}/{_posix_rel(spec)}')
                 except Exception:
                     pass  # Skip malformed configs in subdirectories
 
-        # Prune excluded and gitignored subdirectories in-place
-        filtered_dirs: list[str] = []
-        for d in sorted(dirnames):
-            # Skip hidden directories (e.g. .git, .venv)
-            if d.startswith('.'):
-                continue
+        # Determine if this directory is inside a spec directory. Spec status
+        # cascades from the parent, so no scan over every spec root is needed
+        dir_is_spec = parent_is_spec
+        if rel_dir_str and not dir_is_spec:
+            # Auto-detection by directory name, or a user-designated spec dir
+            dir_is_spec = rel_dir_str.rpartition('/')[2].lower() in SPEC_DIR_NAMES or rel_dir_str in active_spec_roots
+
+        # Prune excluded and gitignored subdirectories before they are ever listed
+        children: list[tuple[str, str, NestedIgnores, bool]] = []
+        for entry in subdirs:
+            d = entry.name
             child_rel = f'{rel_dir_str}/{d}' if rel_dir_str else d
             # Check config exclusions
             if child_rel in working_excluded:
                 continue
             # Check gitignore (append / to match directory patterns)
-            if gitignore_spec.match_file(child_rel + '/'):
+            if nested.is_ignored(child_rel + '/', gitignore_spec):
+                continue
+            children.append((entry.path, child_rel, nested, dir_is_spec))
+        # Reversed so the alphabetically first child is visited next
+        stack.extend(reversed(children))
+
+        # Yield recognized, non-binary files. The extension lookup is a dict hit, so it
+        # runs first and unrecognized files never reach the gitignore patterns
+        for entry in files:
+            filename = entry.name
+            language = identify_filename(filename)
+            if language is None:
                 continue
-            filtered_dirs.append(d)
-
-        dirnames[:] = filtered_dirs
 
-        # Determine if this directory is inside a spec directory
-        dir_is_spec = False
-        if rel_dir_str:
-            # Check auto-detection by directory name
-            if dirpath.name.lower() in SPEC_DIR_NAMES:
-                dir_is_spec = True
-                active_spec_roots.add(rel_dir_str)
-            # Check user-designated spec dirs
-            elif rel_dir_str in active_spec_roots:
-                dir_is_spec = True
-            # Check if parent is a spec dir (cascading)
-            else:
-                for sr in active_spec_roots:
-                    if rel_dir_str.startswith(sr + '/'):
-                        dir_is_spec = True
-                        break
-
-        # Yield recognized, non-binary files
-        for filename in sorted(filenames):
-            file_path = dirpath / filename
             # Skip files matched by gitignore
             file_rel = f'{rel_dir_str}/{filename}' if rel_dir_str else filename
-            if gitignore_spec.match_file(file_rel):
-                continue
-
-            language = identify_language(file_path)
-            if language is None:
+            if nested.is_ignored(file_rel, gitignore_spec):
                 continue
 
-            if _is_binary(file_path):
+            if _needs_sniff(filename, language) and _is_binary(entry.path):
                 continue
 
             # Swap docs → specs if inside a spec directory
             if dir_is_spec and language.category == 'docs':
                 language = as_spec(language)
 
-            yield file_path, language
+            yield Path(entry.path), language
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import functools
+
+import pytest
+
 from tallyman.aggregator import LanguageStats, TallyResult, aggregate, language_percentages
 from tallyman.counter import FileCount
 from tallyman.languages import Language
 
+# Shared (total, code, comment, blank) shapes; aggregate() only reads its inputs
+FC100 = FileCount(100, 80, 10, 10)
+FC50 = FileCount(50, 40, 5, 5)
+FC200 = FileCount(200, 180, 10, 10)
+
 
+@functools.cache
 def _lang(name: str, category: str = 'code', comment: str | None = '#') -> Language:
     return Language(name, category, 'white', comment, (f'.{name.lower()}',))
 
@@ -13,8 +23,8 @@ class TestAggregate:
     def test_single_language(self):
         lang = _lang('Python')
         results = [
-            (lang, FileCount(total_lines=100, code_lines=80, comment_lines=10, blank_lines=10)),
-            (lang, FileCount(total_lines=50, code_lines=40, comment_lines=5, blank_lines=5)),
+            (lang, FC100),
+            (lang, FC50),
         ]
         tally = aggregate(results)
         assert len(tally.by_language) == 1
@@ -25,12 +35,22 @@ class TestAggregate:
         assert stats.blank_lines == 15
         assert stats.file_count == 2
 
+    def test_equal_language_instances_share_a_row(self):
+        """Distinct but equal Language objects (e.g. unpickled copies) are tallied together."""
+        first = Language('Python', 'code', 'white', '#', ('.py',))
+        second = Language('Python', 'code', 'white', '#', ('.py',))
+        assert first is not second
+        tally = aggregate([(first, FC100), (second, FC50)])
+        assert len(tally.by_language) == 1
+        assert tally.by_language[0].file_count == 2
+        assert tally.by_language[0].total_lines == 150
+
     def test_multiple_languages_sorted_descending(self):
         py = _lang('Python')
         rs = _lang('Rust')
         results = [
-            (py, FileCount(total_lines=50, code_lines=40, comment_lines=5, blank_lines=5)),
-            (rs, FileCount(total_lines=200, code_lines=180, comment_lines=10, blank_lines=10)),
+            (py, FC50),
+            (rs, FC200),
         ]
         tally = aggregate(results)
         assert tally.by_language[0].language.name == 'Rust'
@@ -41,16 +61,14 @@ class TestAggregate:
         css = _lang('CSS', 'design', None)
         md = _lang('Markdown', 'docs', None)
         results = [
-            (py, FileCount(total_lines=100, code_lines=80, comment_lines=10, blank_lines=10)),
-            (css, FileCount(total_lines=50, code_lines=45, comment_lines=0, blank_lines=5)),
-            (md, FileCount(total_lines=30, code_lines=25, comment_lines=0, blank_lines=5)),
+            (py, FC100),
+            (css, FileCount(50, 45, 0, 5)),
+            (md, FileCount(30, 25, 0, 5)),
         ]
         tally = aggregate(results)
 
-        cat_names = [c.name for c in tally.by_category]
-        assert 'Code' in cat_names
-        assert 'Design' in cat_names
-        assert 'Docs' in cat_names
+        cat_names = {c.name for c in tally.by_category}
+        assert {'Code', 'Design', 'Docs'} <= cat_names
 
         code_cat = next(c for c in tally.by_category if c.name == 'Code')
         assert code_cat.total_lines == 100
@@ -59,7 +77,7 @@ class TestAggregate:
     def test_grand_total(self):
         py = _lang('Python')
         results = [
-            (py, FileCount(total_lines=100, code_lines=80, comment_lines=10, blank_lines=10)),
+            (py, FC100),
         ]
         tally = aggregate(results)
         assert tally.grand_total_lines == 100
@@ -118,7 +136,7 @@ class TestAggregateSpecs:
         results = [
             (md, FileCount(total_lines=100, blank_lines=10)),
             (spec_md, FileCount(total_lines=200, blank_lines=20)),
-            (toml, FileCount(total_lines=50, code_lines=40, comment_lines=5, blank_lines=5)),
+            (toml, FC50),
         ]
 
         tally = aggregate(results)
@@ -127,6 +145,19 @@ class TestAggregateSpecs:
         assert cat_names.index('Specs') < cat_names.index('Data')
 
 
+@pytest.fixture(scope='module')
+def pcts_two_langs() -> list[tuple[Language, float]]:
+    tally = TallyResult(
+        by_language=[
+            LanguageStats(language=_lang('Python'), total_lines=75),
+            LanguageStats(language=_lang('Rust'), total_lines=25),
+        ],
+        by_category=[],
+        grand_total_lines=100,
+    )
+    return language_percentages(tally)
+
+
 class TestLanguagePercentages:
     def test_single_language_is_100_percent(self):
         py = _lang('Python')
@@ -140,21 +171,19 @@ class TestLanguagePercentages:
         assert pcts[0][0] is py
         assert pcts[0][1] == 100.0
 
-    def test_percentages_sum_to_100(self):
+    def test_single_language_with_zero_lines(self):
+        """The zero-total guard still applies before the single-language shortcut."""
         py = _lang('Python')
-        rs = _lang('Rust')
-        tally = TallyResult(
-            by_language=[
-                LanguageStats(language=py, total_lines=75),
-                LanguageStats(language=rs, total_lines=25),
-            ],
-            by_category=[],
-            grand_total_lines=100,
-        )
-        pcts = language_percentages(tally)
-        total = sum(p[1] for p in pcts)
+        tally = TallyResult(by_language=[LanguageStats(language=py)], by_category=[], grand_total_lines=0)
+        assert language_percentages(tally) == []
+
+    def test_percentages_sum_to_100(self, pcts_two_langs):
+        total = sum(p[1] for p in pcts_two_langs)
         assert abs(total - 100.0) < 0.01
 
+    def test_percentages_follow_line_share(self, pcts_two_langs):
+        assert [(lang.name, pct) for lang, pct in pcts_two_langs] == [('Python', 75.0), ('Rust', 25.0)]
+
     def test_empty_returns_empty(self):
         tally = TallyResult(by_language=[], by_category=[], grand_total_lines=0)
         assert language_percentages(tally) == []
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 
+import pathspec
+import pytest
+
 from tallyman.config import CONFIG_FILENAME, discover_nested_configs, find_config, load_config, save_config
-from tallyman.tui.setup_app import SetupApp
+from tallyman.walker import GitIgnoreSpec
+
+
+@pytest.fixture(scope='module')
+def setup_app():
+    """The setup TUI module, imported on first use so collecting this file skips Textual."""
+    from tallyman.tui import setup_app
+
+    return setup_app
 
 
 class TestFindConfig:
@@ -104,64 +116,39 @@ class TestSaveConfig:
         assert '[specs]' not in content
 
 
-class TestDiscoverNestedConfigs:
-    def test_finds_nested_exclusions(self, tmp_path: Path):
-        """Exclusions from a nested config are translated to root-relative paths."""
-        project = tmp_path / 'project1'
-        project.mkdir()
-        save_config(project / CONFIG_FILENAME, {'vendor', 'static/external'}, set())
+# (configs to save as {relative dir: (excluded, spec)}, expected excluded, expected spec)
+NESTED_CONFIG_CASES = [
+    pytest.param(
+        {'project1': ({'vendor', 'static/external'}, set())},
+        {'project1/vendor', 'project1/static/external'},
+        set(),
+        id='nested-exclusions',
+    ),
+    pytest.param({'project1': (set(), {'docs/arch'})}, set(), {'project1/docs/arch'}, id='nested-spec-dirs'),
+    pytest.param({'.': ({'vendor'}, set())}, set(), set(), id='root-config-ignored'),
+    pytest.param(
+        {'project1': ({'vendor'}, set()), 'project2': ({'node_modules'}, {'docs'})},
+        {'project1/vendor', 'project2/node_modules'},
+        {'project2/docs'},
+        id='multiple-configs',
+    ),
+    pytest.param({'org/repos/myapp': ({'typings'}, set())}, {'org/repos/myapp/typings'}, set(), id='deeply-nested'),
+    pytest.param({'.hidden': ({'vendor'}, set())}, set(), set(), id='hidden-dir-skipped'),
+]
 
-        result = discover_nested_configs(tmp_path)
-        assert result.excluded_dirs == {'project1/vendor', 'project1/static/external'}
 
-    def test_finds_nested_spec_dirs(self, tmp_path: Path):
-        """Spec dirs from a nested config are translated to root-relative paths."""
-        project = tmp_path / 'project1'
-        project.mkdir()
-        save_config(project / CONFIG_FILENAME, set(), {'docs/arch'})
-
-        result = discover_nested_configs(tmp_path)
-        assert result.spec_dirs == {'project1/docs/arch'}
-
-    def test_ignores_root_config(self, tmp_path: Path):
-        """A config at the root directory itself is not included."""
-        save_config(tmp_path / CONFIG_FILENAME, {'vendor'}, set())
-
-        result = discover_nested_configs(tmp_path)
-        assert result.excluded_dirs == set()
-        assert result.spec_dirs == set()
-
-    def test_multiple_nested_configs(self, tmp_path: Path):
-        """Multiple nested configs are all discovered and merged."""
-        p1 = tmp_path / 'project1'
-        p1.mkdir()
-        save_config(p1 / CONFIG_FILENAME, {'vendor'}, set())
-
-        p2 = tmp_path / 'project2'
-        p2.mkdir()
-        save_config(p2 / CONFIG_FILENAME, {'node_modules'}, {'docs'})
-
-        result = discover_nested_configs(tmp_path)
-        assert result.excluded_dirs == {'project1/vendor', 'project2/node_modules'}
-        assert result.spec_dirs == {'project2/docs'}
-
-    def test_deeply_nested_config(self, tmp_path: Path):
-        """Config found deep in the tree is translated correctly."""
-        deep = tmp_path / 'org' / 'repos' / 'myapp'
-        deep.mkdir(parents=True)
-        save_config(deep / CONFIG_FILENAME, {'typings'}, set())
+class TestDiscoverNestedConfigs:
+    @pytest.mark.parametrize(('configs', 'expected_excluded', 'expected_spec'), NESTED_CONFIG_CASES)
+    def test_discover(self, tmp_path: Path, configs, expected_excluded, expected_spec):
+        """Nested configs are translated to root-relative paths; root and hidden configs are not used."""
+        for rel, (excluded, spec) in configs.items():
+            directory = tmp_path / rel
+            directory.mkdir(parents=True, exist_ok=True)
+            save_config(directory / CONFIG_FILENAME, excluded, spec)
 
         result = discover_nested_configs(tmp_path)
-        assert result.excluded_dirs == {'org/repos/myapp/typings'}
-
-    def test_skips_hidden_directories(self, tmp_path: Path):
-        """Configs inside hidden directories are not discovered."""
-        hidden = tmp_path / '.hidden'
-        hidden.mkdir()
-        save_config(hidden / CONFIG_FILENAME, {'vendor'}, set())
-
-        result = discover_nested_configs(tmp_path)
-        assert result.excluded_dirs == set()
+        assert result.excluded_dirs == expected_excluded
+        assert result.spec_dirs == expected_spec
 
     def test_malformed_config_skipped(self, tmp_path: Path):
         """A malformed config file is silently skipped."""
@@ -174,21 +161,85 @@ class TestDiscoverNestedConfigs:
         assert result.spec_dirs == set()
 
 
+# (excluded paths, expected after cleaning)
+CLEAN_EXCLUSION_CASES = [
+    pytest.param(frozenset({'vendor', 'vendor/sub1', 'vendor/sub2', 'other'}), {'vendor', 'other'}, id='children'),
+    pytest.param(frozenset({'src', 'tests'}), {'src', 'tests'}, id='no-redundancy'),
+    pytest.param(frozenset(), set(), id='empty'),
+    pytest.param(frozenset({'a', 'a/b', 'a/b/c'}), {'a'}, id='nested-depth'),
+    pytest.param(frozenset({'a', 'a-b', 'a-b/c', 'a/c'}), {'a', 'a-b'}, id='sibling-name-prefix'),
+]
+
+
 class TestCleanExclusions:
-    def test_removes_children_of_excluded_parents(self):
-        excluded = {'vendor', 'vendor/sub1', 'vendor/sub2', 'other'}
-        cleaned = SetupApp._clean_exclusions(excluded)
-        assert cleaned == {'vendor', 'other'}
-
-    def test_no_redundancy(self):
-        excluded = {'src', 'tests'}
-        cleaned = SetupApp._clean_exclusions(excluded)
-        assert cleaned == {'src', 'tests'}
-
-    def test_empty(self):
-        assert SetupApp._clean_exclusions(set()) == set()
-
-    def test_nested_depth(self):
-        excluded = {'a', 'a/b', 'a/b/c'}
-        cleaned = SetupApp._clean_exclusions(excluded)
-        assert cleaned == {'a'}
+    @pytest.mark.parametrize(('excluded', 'expected'), CLEAN_EXCLUSION_CASES)
+    def test_clean(self, setup_app, excluded, expected):
+        assert setup_app.SetupApp._clean_exclusions(set(excluded)) == expected
+
+
+class TestSetupTreeLazyExcluded:
+    def _run(self, setup_app, root: Path, excluded: set[str], check) -> None:
+        app = setup_app.SetupApp(root, GitIgnoreSpec(pathspec.PathSpec.from_lines('gitignore', [])), excluded, set())
+
+        async def drive() -> None:
+            async with app.run_test() as pilot:
+                await check(app, app.query_one(setup_app.SetupTree), pilot)
+
+        asyncio.run(drive())
+
+    def test_excluded_dir_children_read_on_expand(self, setup_app, tmp_path: Path):
+        (tmp_path / 'vendor' / 'lib').mkdir(parents=True)
+        (tmp_path / 'src').mkdir()
+
+        async def check(app, tree, pilot) -> None:
+            vendor = next(c for c in tree.root.children if c.data['path'] == 'vendor')
+            assert vendor.data['pending']
+            assert not vendor.children
+            vendor.expand()
+            await pilot.pause()
+            assert [c.data['path'] for c in vendor.children] == ['vendor/lib']
+            assert vendor.children[0].data['excluded']
+
+        self._run(setup_app, tmp_path, {'vendor'}, check)
+
+    def test_nested_gitignore_marks_subdirectories(self, setup_app, tmp_path: Path):
+        (tmp_path / 'src' / 'build').mkdir(parents=True)
+        (tmp_path / 'src' / 'app').mkdir()
+        (tmp_path / 'src' / '.gitignore').write_text('build/\n')
+        (tmp_path / 'vendor' / 'dist').mkdir(parents=True)
+        (tmp_path / 'vendor' / '.gitignore').write_text('dist/\n')
+
+        async def check(app, tree, pilot) -> None:
+            src = next(c for c in tree.root.children if c.data['path'] == 'src')
+            flags = {c.data['path']: c.data['gitignored'] for c in src.children}
+            assert flags == {'src/app': False, 'src/build': True}
+            # Unread excluded directories pick up their own .gitignore when expanded
+            vendor = next(c for c in tree.root.children if c.data['path'] == 'vendor')
+            vendor.expand()
+            await pilot.pause()
+            assert vendor.children[0].data['gitignored']
+
+        self._run(setup_app, tmp_path, {'vendor'}, check)
+
+    def test_including_unread_dir_clears_saved_child_exclusions(self, setup_app, tmp_path: Path):
+        (tmp_path / 'vendor' / 'lib').mkdir(parents=True)
+
+        async def check(app, tree, pilot) -> None:
+            vendor = next(c for c in tree.root.children if c.data['path'] == 'vendor')
+            app._set_excluded(vendor, False)
+            assert app.user_excluded == set()
+
+        self._run(setup_app, tmp_path, {'vendor', 'vendor/lib'}, check)
+
+    def test_spec_toggle_cascades_to_children(self, setup_app, tmp_path: Path):
+        (tmp_path / 'design' / 'ui').mkdir(parents=True)
+
+        async def check(app, tree, pilot) -> None:
+            design = tree.root.children[0]
+            app._set_spec(design, True)
+            assert app.user_spec_dirs == {'design', 'design/ui'}
+            assert design.children[0].data['spec']
+            app._set_spec(design, False)
+            assert app.user_spec_dirs == set()
+
+        self._run(setup_app, tmp_path, set(), check)
@@ -1,81 +1,104 @@
 from __future__ import annotations
 
+import functools
 from pathlib import Path
 
-from tallyman.counter import FileCount, count_lines
+import pytest
+
+import tallyman.counter
+from tallyman.counter import FileCount, count_files, count_lines
 from tallyman.languages import Language
 
 
+@functools.cache
 def _lang(comment: str | None = '#') -> Language:
     """Helper to build a test language."""
     return Language('Test', 'code', 'white', comment, ('.test',))
 
 
-class TestCountLines:
-    def test_python_style_comments(self, tmp_path: Path):
-        f = tmp_path / 'example.py'
-        f.write_text('# comment\ncode = 1\n\nmore_code = 2\n# another comment\n')
-        result = count_lines(f, _lang('#'))
-        assert result.total_lines == 5
-        assert result.comment_lines == 2
-        assert result.blank_lines == 1
-        assert result.code_lines == 2
-
-    def test_slash_comments(self, tmp_path: Path):
-        f = tmp_path / 'example.js'
-        f.write_text('// comment\nlet x = 1;\n\n// another\n')
-        result = count_lines(f, _lang('//'))
-        assert result.total_lines == 4
-        assert result.comment_lines == 2
-        assert result.blank_lines == 1
-        assert result.code_lines == 1
-
-    def test_dash_comments(self, tmp_path: Path):
-        f = tmp_path / 'example.lua'
-        f.write_text('-- comment\nprint("hi")\n')
-        result = count_lines(f, _lang('--'))
-        assert result.total_lines == 2
-        assert result.comment_lines == 1
-        assert result.code_lines == 1
-
-    def test_no_comment_detection(self, tmp_path: Path):
-        f = tmp_path / 'example.html'
-        f.write_text('<!-- comment -->\n<p>text</p>\n\n')
-        result = count_lines(f, _lang(None))
-        assert result.total_lines == 3
-        assert result.comment_lines == 0  # No detection for this language
-        assert result.blank_lines == 1
-        assert result.code_lines == 2
-
-    def test_empty_file(self, tmp_path: Path):
-        f = tmp_path / 'empty.py'
-        f.write_text('')
-        result = count_lines(f, _lang('#'))
-        assert result == FileCount(0, 0, 0, 0)
+# (file bytes, comment marker, expected counts as total, code, comment, blank)
+COUNT_CASES = [
+    pytest.param(
+        b'# comment\ncode = 1\n\nmore_code = 2\n# another comment\n', '#', FileCount(5, 2, 2, 1), id='python-comments'
+    ),
+    pytest.param(b'// comment\nlet x = 1;\n\n// another\n', '//', FileCount(4, 1, 2, 1), id='slash-comments'),
+    pytest.param(b'-- comment\nprint("hi")\n', '--', FileCount(2, 1, 1, 0), id='dash-comments'),
+    # No comment detection for this language: comment-looking lines count as code
+    pytest.param(b'<!-- comment -->\n<p>text</p>\n\n', None, FileCount(3, 2, 0, 1), id='no-marker'),
+    pytest.param(b'', '#', FileCount(0, 0, 0, 0), id='empty'),
+    pytest.param(b'\n\n\n', '#', FileCount(3, 0, 0, 3), id='only-blank'),
+    pytest.param(b'    # indented comment\n    code()\n', '#', FileCount(2, 1, 1, 0), id='indented-comment'),
+    pytest.param(
+        b'\t# tabbed comment\nx = 1  # trailing comment is still code\n \t \n',
+        '#',
+        FileCount(3, 1, 1, 1),
+        id='tab-indented-and-trailing-comment',
+    ),
+    pytest.param(b'hello\nworld\xff\n', '#', FileCount(2, 2, 0, 0), id='invalid-utf8'),
+    pytest.param(b'# comment\r\ncode = 1\r\n\r\n  \t\r\n', '#', FileCount(4, 1, 1, 2), id='crlf'),
+    pytest.param(b'code = 1\n# last', '#', FileCount(2, 1, 1, 0), id='no-trailing-newline'),
+    pytest.param(b'code = 1\n   ', '#', FileCount(2, 1, 0, 1), id='whitespace-only-final-line'),
+    # Same line rules as str.splitlines()/str.strip() on the decoded text
+    pytest.param(b'# one\rcode = 1\r\r', '#', FileCount(3, 1, 1, 1), id='cr-only'),
+    pytest.param(b'code = 1\x0c\x0c# next\n', '#', FileCount(3, 1, 1, 1), id='form-feed-breaks'),
+    pytest.param(
+        '\u00a0\u3000# wide-space comment\n\u00a0\n'.encode(), '#', FileCount(2, 0, 1, 1), id='unicode-spaces'
+    ),
+    pytest.param('x = 1\u2028# after separator\n'.encode(), '#', FileCount(2, 1, 1, 0), id='line-separator'),
+]
 
-    def test_only_blank_lines(self, tmp_path: Path):
-        f = tmp_path / 'blanks.py'
-        f.write_text('\n\n\n')
-        result = count_lines(f, _lang('#'))
-        assert result.total_lines == 3
-        assert result.blank_lines == 3
-        assert result.code_lines == 0
 
-    def test_indented_comment(self, tmp_path: Path):
-        f = tmp_path / 'indented.py'
-        f.write_text('    # indented comment\n    code()\n')
-        result = count_lines(f, _lang('#'))
-        assert result.comment_lines == 1
-        assert result.code_lines == 1
+class TestCountLines:
+    @pytest.mark.parametrize('content,marker,expected', COUNT_CASES)
+    def test_counts(self, tmp_path: Path, content: bytes, marker: str | None, expected: FileCount):
+        f = tmp_path / 'example.test'
+        f.write_bytes(content)
+        assert count_lines(f, _lang(marker)) == expected
 
     def test_nonexistent_file(self, tmp_path: Path):
         f = tmp_path / 'nope.py'
         result = count_lines(f, _lang('#'))
         assert result == FileCount(0, 0, 0, 0)
 
-    def test_encoding_errors_handled(self, tmp_path: Path):
-        f = tmp_path / 'bad.py'
-        f.write_bytes(b'hello\nworld\xff\n')
-        result = count_lines(f, _lang('#'))
-        assert result.total_lines == 2
-        assert result.code_lines == 2
+    def test_streamed_large_file_matches_in_memory(self, tmp_path: Path, monkeypatch):
+        f = tmp_path / 'big.py'
+        f.write_bytes(b'# comment\n\ncode = 1\n    # indented\n' + b'x' * 50 + b'\n  \t\r\n# tail')
+        expected = count_lines(f, _lang('#'))
+        monkeypatch.setattr(tallyman.counter, 'STREAM_THRESHOLD', 0)
+        monkeypatch.setattr(tallyman.counter, 'STREAM_CHUNK_SIZE', 7)
+        assert count_lines(f, _lang('#')) == expected
+        assert expected == FileCount(total_lines=7, code_lines=2, comment_lines=3, blank_lines=2)
+
+
+class TestCountFiles:
+    def _files(self, tmp_path: Path, n: int) -> list[tuple[Path, Language]]:
+        lang = _lang('#')
+        files = []
+        for i in range(n):
+            f = tmp_path / f'f{i}.py'
+            f.write_text('# comment\n' + 'code()\n' * i)
+            files.append((f, lang))
+        return files
+
+    def test_serial_preserves_order(self, tmp_path: Path):
+        files = self._files(tmp_path, 5)
+        results = list(count_files(files, jobs=1))
+        assert [counts.code_lines for _, counts in results] == [0, 1, 2, 3, 4]
+
+    def test_parallel_matches_serial(self, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr(tallyman.counter, 'PARALLEL_THRESHOLD', 0)
+        monkeypatch.setattr(tallyman.counter, 'FILES_PER_WORKER', 1)
+        files = self._files(tmp_path, 10)
+        parallel = list(count_files(files, jobs=2))
+        assert parallel == list(count_files(files, jobs=1))
+        assert all(lang is files[0][1] for lang, _ in parallel)
+
+    def test_accepts_iterator(self, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr(tallyman.counter, 'PARALLEL_THRESHOLD', 3)
+        monkeypatch.setattr(tallyman.counter, 'FILES_PER_WORKER', 2)
+        files = self._files(tmp_path, 6)
+        results = list(count_files(iter(files), jobs=2))
+        assert [counts.code_lines for _, counts in results] == [0, 1, 2, 3, 4, 5]
+
+    def test_empty(self):
+        assert list(count_files([])) == []
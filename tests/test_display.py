@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from tallyman.aggregator import aggregate
+from tallyman.counter import FileCount
+from tallyman.display import _language_display_names
+from tallyman.languages import Language
+
+
+class TestLanguageDisplayNames:
+    def test_same_category_keeps_plain_name(self):
+        first = Language('Python', 'code', 'white', '#', ('.py',))
+        second = Language('Python', 'code', 'white', '#', ('.py',))
+        tally = aggregate([(first, FileCount(10, 10, 0, 0)), (second, FileCount(5, 5, 0, 0))])
+        assert list(_language_display_names(tally).values()) == ['Python']
+
+    def test_different_categories_get_suffix(self):
+        md = Language('Markdown', 'docs', 'white', None, ('.md',))
+        spec_md = Language('Markdown', 'specs', 'white', None, ('.md',))
+        tally = aggregate([(md, FileCount(10, 10, 0, 0)), (spec_md, FileCount(5, 5, 0, 0))])
+        names = _language_display_names(tally)
+        assert names[md] == 'Markdown (docs)'
+        assert names[spec_md] == 'Markdown (specs)'
@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
+import functools
 from pathlib import Path
 
+import pytest
+from PIL import Image
+
 from tallyman.aggregator import TallyResult, aggregate
 from tallyman.counter import FileCount
 from tallyman.image import (
     DARK_THEME,
     LIGHT_THEME,
+    PADDING,
+    _desktop_dir,
     _hex_to_rgb,
     _rich_color_to_rgb,
     generate_image,
@@ -18,6 +24,7 @@ from tallyman.image import (
 from tallyman.languages import Language
 
 
+@functools.cache
 def _lang(name: str, category: str = 'code', color: str = 'yellow') -> Language:
     return Language(name, category, color, '#', (f'.{name.lower()}',))
 
@@ -41,31 +48,40 @@ class TestSlugifyDirectoryName:
         assert slugify_directory_name('Tallyman') == 'tallyman'
 
 
-class TestResolveImagePath:
-    def test_no_conflict_uses_slug_png(self, tmp_path, monkeypatch):
-        monkeypatch.setattr(Path, 'home', lambda: tmp_path)
-        desktop = tmp_path / 'Desktop'
-        desktop.mkdir()
-        out = resolve_image_path('My Project', desktop_preferred=True)
-        assert out == desktop / 'my-project.png'
+def _seed(directory: Path, names: list[str]) -> None:
+    """Create empty files named *names* in *directory*."""
+    for name in names:
+        (directory / name).touch()
 
-    def test_conflict_adds_numeric_suffix(self, tmp_path, monkeypatch):
-        monkeypatch.setattr(Path, 'home', lambda: tmp_path)
-        desktop = tmp_path / 'Desktop'
-        desktop.mkdir()
-        (desktop / 'my-project.png').touch()
-        out = resolve_image_path('My Project', desktop_preferred=True)
-        assert out == desktop / 'my-project-1.png'
 
-    def test_multiple_conflicts_increment_suffix(self, tmp_path, monkeypatch):
+class TestResolveImagePath:
+    @pytest.fixture(autouse=True)
+    def _fresh_desktop_lookup(self):
+        # The Desktop lookup is cached per process; each test points Path.home somewhere new
+        _desktop_dir.cache_clear()
+        yield
+        _desktop_dir.cache_clear()
+
+    @pytest.fixture
+    def desktop(self, tmp_path, monkeypatch):
         monkeypatch.setattr(Path, 'home', lambda: tmp_path)
         desktop = tmp_path / 'Desktop'
         desktop.mkdir()
-        (desktop / 'foo.png').touch()
-        (desktop / 'foo-1.png').touch()
-        (desktop / 'foo-2.png').touch()
-        out = resolve_image_path('foo', desktop_preferred=True)
-        assert out == desktop / 'foo-3.png'
+        return desktop
+
+    @pytest.mark.parametrize(
+        ('name', 'existing', 'expected'),
+        [
+            ('My Project', [], 'my-project.png'),
+            ('My Project', ['my-project.png'], 'my-project-1.png'),
+            ('foo', ['foo.png', 'foo-1.png', 'foo-2.png'], 'foo-3.png'),
+            ('foo', ['foo.png', 'foo-2.png', 'foobar.png'], 'foo-1.png'),
+        ],
+        ids=['no-conflict', 'conflict', 'multiple-conflicts', 'gap-in-suffixes'],
+    )
+    def test_suffix_for_existing_files(self, desktop, name, existing, expected):
+        _seed(desktop, existing)
+        assert resolve_image_path(name, desktop_preferred=True) == desktop / expected
 
     def test_desktop_missing_falls_back_to_cwd(self, tmp_path, monkeypatch):
         monkeypatch.setattr(Path, 'home', lambda: tmp_path)
@@ -74,10 +90,7 @@ class TestResolveImagePath:
         out = resolve_image_path('proj', desktop_preferred=True)
         assert out == tmp_path / 'proj.png'
 
-    def test_desktop_preferred_false_uses_cwd(self, tmp_path, monkeypatch):
-        monkeypatch.setattr(Path, 'home', lambda: tmp_path)
-        desktop = tmp_path / 'Desktop'
-        desktop.mkdir()
+    def test_desktop_preferred_false_uses_cwd(self, desktop, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
         out = resolve_image_path('x', desktop_preferred=False)
         assert out == tmp_path / 'x.png'
@@ -100,43 +113,61 @@ class TestRichColorToRgb:
         assert r == g == b
 
 
+@pytest.fixture(scope='module')
+def tally_with_data() -> TallyResult:
+    py = _lang('Python')
+    md = _lang('Markdown', 'docs', 'white')
+    results = [
+        (py, FileCount(100, 80, 10, 10)),
+        (md, FileCount(50, 45, 0, 5)),
+    ]
+    return aggregate(results)
+
+
+@pytest.fixture(scope='module')
+def tally_empty() -> TallyResult:
+    return aggregate([])
+
+
+@pytest.fixture(scope='module')
+def rendered_png(tmp_path_factory, tally_with_data, tally_empty):
+    """Render each (with_data, theme) card once per module and hand back the PNG bytes."""
+    out_dir = tmp_path_factory.mktemp('cards')
+    cache: dict[tuple[bool, str], bytes] = {}
+
+    def render(with_data: bool, theme_name: str) -> bytes:
+        key = (with_data, theme_name)
+        if key not in cache:
+            theme = DARK_THEME if theme_name == 'dark' else LIGHT_THEME
+            out = out_dir / f'{"data" if with_data else "empty"}-{theme_name}.png'
+            generate_image(tally_with_data if with_data else tally_empty, 'test-project', out, theme)
+            cache[key] = out.read_bytes()
+        return cache[key]
+
+    return render
+
+
 class TestGenerateImage:
-    def _make_tally(self, with_data: bool = True) -> TallyResult:
-        if not with_data:
-            return aggregate([])
-        py = _lang('Python')
-        md = _lang('Markdown', 'docs', 'white')
+    def test_produces_valid_png(self, rendered_png):
+        assert rendered_png(True, 'dark')[:8] == b'\x89PNG\r\n\x1a\n'
+
+    def test_empty_results_produces_image(self, rendered_png):
+        assert rendered_png(False, 'dark')[:8] == b'\x89PNG\r\n\x1a\n'
+
+    def test_dark_and_light_differ(self, rendered_png):
+        assert rendered_png(True, 'dark') != rendered_png(True, 'light')
+
+    def test_tiny_other_segment_keeps_its_pixel(self, tmp_path: Path):
+        """Widths come from exact line counts, so a sliver of 'Other' after two near-halves still shows."""
         results = [
-            (py, FileCount(total_lines=100, code_lines=80, comment_lines=10, blank_lines=10)),
-            (md, FileCount(total_lines=50, code_lines=45, comment_lines=0, blank_lines=5)),
+            (_lang('Python'), FileCount(499_973)),
+            (_lang('Rust', color='red'), FileCount(499_973)),
+            (_lang('Go', color='blue'), FileCount(35)),
         ]
-        return aggregate(results)
-
-    def test_produces_valid_png(self, tmp_path):
-        tally = self._make_tally()
-        out = tmp_path / 'out.png'
-        generate_image(tally, 'test-project', out, DARK_THEME)
-        assert out.exists()
-        with open(out, 'rb') as f:
-            header = f.read(8)
-        assert header[:8] == b'\x89PNG\r\n\x1a\n'
-
-    def test_empty_results_produces_image(self, tmp_path):
-        tally = self._make_tally(with_data=False)
-        out = tmp_path / 'empty.png'
-        generate_image(tally, 'empty', out, DARK_THEME)
-        assert out.exists()
-        with open(out, 'rb') as f:
-            assert f.read(8) == b'\x89PNG\r\n\x1a\n'
-
-    def test_dark_and_light_differ(self, tmp_path):
-        tally = self._make_tally()
-        dark_path = tmp_path / 'dark.png'
-        light_path = tmp_path / 'light.png'
-        generate_image(tally, 'proj', dark_path, DARK_THEME)
-        generate_image(tally, 'proj', light_path, LIGHT_THEME)
-        with open(dark_path, 'rb') as f:
-            dark_bytes = f.read()
-        with open(light_path, 'rb') as f:
-            light_bytes = f.read()
-        assert dark_bytes != light_bytes
+        out = tmp_path / 'sliver.png'
+        generate_image(aggregate(results), 'sliver', out, DARK_THEME)
+        with Image.open(out) as img:
+            rgb = img.convert('RGB')
+            # The two halves take 539px each of the 1080px bar; Other paints the next pixel
+            column = {rgb.getpixel((PADDING + 1078, y)) for y in range(rgb.height)}
+        assert _rich_color_to_rgb('grey50') in column
@@ -1,58 +1,64 @@
 from __future__ import annotations
 
+from collections import Counter
 from pathlib import Path
 
 import pytest
 
-from tallyman.languages import EXTENSION_MAP, FILENAME_MAP, LANGUAGES, as_spec, identify_language
+from tallyman.languages import (
+    EXTENSION_MAP,
+    FILENAME_MAP,
+    LANGUAGES,
+    as_spec,
+    identify_filename,
+    identify_language,
+)
+
+IDENTIFY_CASES = [
+    ('main.py', 'Python', 'code'),
+    ('lib.rs', 'Rust', 'code'),
+    ('App.jsx', 'JavaScript', 'code'),
+    ('component.tsx', 'TypeScript', 'code'),
+    ('README.md', 'Markdown', 'docs'),
+    ('README.MD', 'Markdown', 'docs'),
+    ('styles.css', 'CSS', 'design'),
+    *(
+        (f'template{ext}', 'HTML', 'design')
+        for ext in ('.xhtml', '.shtml', '.pt', '.jinja', '.jinja2', '.j2', '.njk', '.hbs', '.ejs', '.mustache')
+    ),
+    ('photo.png', None, None),
+    ('README', None, None),
+]
 
 
 class TestIdentifyLanguage:
+    @pytest.mark.parametrize(('filename', 'name', 'category'), IDENTIFY_CASES)
+    def test_identify(self, filename, name, category):
+        lang = identify_language(Path(filename))
+        if name is None:
+            assert lang is None
+        else:
+            assert lang is not None
+            assert (lang.name, lang.category) == (name, category)
+
     def test_python_file(self):
         assert identify_language(Path('main.py')) == EXTENSION_MAP['.py']
 
-    def test_rust_file(self):
-        lang = identify_language(Path('lib.rs'))
-        assert lang is not None
-        assert lang.name == 'Rust'
-
-    def test_javascript_jsx(self):
-        lang = identify_language(Path('App.jsx'))
-        assert lang is not None
-        assert lang.name == 'JavaScript'
-
-    def test_typescript_tsx(self):
-        lang = identify_language(Path('component.tsx'))
-        assert lang is not None
-        assert lang.name == 'TypeScript'
-
-    def test_markdown(self):
-        lang = identify_language(Path('README.md'))
-        assert lang is not None
-        assert lang.name == 'Markdown'
-        assert lang.category == 'docs'
-
-    def test_html_template_extensions(self):
-        for ext in ('.xhtml', '.shtml', '.pt', '.jinja', '.jinja2', '.j2', '.njk', '.hbs', '.ejs', '.mustache'):
-            lang = identify_language(Path(f'template{ext}'))
-            assert lang is not None, f'{ext} not recognized'
-            assert lang.name == 'HTML', f'{ext} mapped to {lang.name}, expected HTML'
-
-    def test_css(self):
-        lang = identify_language(Path('styles.css'))
-        assert lang is not None
-        assert lang.category == 'design'
-
-    def test_unknown_extension(self):
-        assert identify_language(Path('photo.png')) is None
-
-    def test_no_extension_unknown(self):
-        assert identify_language(Path('README')) is None
-
-    def test_case_insensitive(self):
-        lang = identify_language(Path('README.MD'))
-        assert lang is not None
-        assert lang.name == 'Markdown'
+    def test_identify_filename_matches_path_lookup(self):
+        names = [
+            'main.py',
+            'README.MD',
+            'Makefile',
+            'Dockerfile.dev',
+            'analysis.R',
+            '.bashrc',
+            'README',
+            'x.tar.gz',
+            '..py',
+            'trailing.',
+        ]
+        for name in names:
+            assert identify_filename(name) is identify_language(Path('src') / name), name
 
 
 class TestFilenameIdentification:
@@ -125,11 +131,9 @@ class TestFilenameIdentification:
 
 class TestLanguageRegistry:
     def test_no_duplicate_extensions(self):
-        seen: dict[str, str] = {}
-        for lang in LANGUAGES:
-            for ext in lang.extensions:
-                assert ext not in seen, f'Extension {ext} is mapped to both {seen[ext]} and {lang.name}'
-                seen[ext] = lang.name
+        counts = Counter(ext for lang in LANGUAGES for ext in lang.extensions)
+        dupes = {ext: [lang.name for lang in LANGUAGES if ext in lang.extensions] for ext, n in counts.items() if n > 1}
+        assert not dupes, f'Extensions mapped to more than one language: {dupes}'
 
     def test_all_languages_have_extensions(self):
         for lang in LANGUAGES:
@@ -148,6 +152,10 @@ class TestLanguageRegistry:
     def test_at_least_30_languages(self):
         assert len(LANGUAGES) >= 30
 
+    def test_has_comment_marker_flag(self):
+        for lang in LANGUAGES:
+            assert lang.has_comment_marker == (lang.single_line_comment is not None), lang.name
+
     def test_language_is_frozen(self):
         lang = LANGUAGES[0]
         try:
@@ -172,6 +180,14 @@ class TestAsSpec:
         assert md is not None
         assert as_spec(md) is as_spec(md)
 
+    def test_spec_variant_is_a_distinct_key(self):
+        md = identify_language(Path('test.md'))
+        assert md is not None
+        spec_md = as_spec(md)
+        assert spec_md != md
+        assert len({md, spec_md}) == 2
+        assert spec_md == as_spec(md)
+
     def test_rejects_non_docs(self):
         py = identify_language(Path('test.py'))
         assert py is not None
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
+import pathspec
+import pytest
+
+from tallyman.aggregator import aggregate
 from tallyman.config import save_config
-from tallyman.walker import _is_binary, find_git_root, load_gitignore, walk_project
+from tallyman.counter import count_files
+from tallyman.walker import BINARY_SNIFF_BYTES, GitIgnoreSpec, _is_binary, find_git_root, load_gitignore, walk_project
 
 
 class TestFindGitRoot:
@@ -20,6 +26,10 @@ class TestFindGitRoot:
     def test_returns_none_when_no_git(self, tmp_path: Path):
         assert find_git_root(tmp_path) is None
 
+    def test_git_file_marks_worktree_root(self, tmp_path: Path):
+        (tmp_path / '.git').write_text('gitdir: /elsewhere/.git/worktrees/wt\n')
+        assert find_git_root(tmp_path / '.') == tmp_path
+
 
 class TestLoadGitignore:
     def test_loads_gitignore(self, tmp_path: Path):
@@ -29,6 +39,13 @@ class TestLoadGitignore:
         assert spec.match_file('error.log')
         assert not spec.match_file('main.py')
 
+    def test_loads_crlf_gitignore(self, tmp_path: Path):
+        (tmp_path / '.gitignore').write_bytes(b'build/\r\n*.log\r\n')
+        spec = load_gitignore(tmp_path)
+        assert spec.match_file('build/')
+        assert spec.match_file('error.log')
+        assert not spec.match_file('main.py')
+
     def test_no_gitignore(self, tmp_path: Path):
         spec = load_gitignore(tmp_path)
         assert not spec.match_file('anything.py')
@@ -63,6 +80,21 @@ class TestLoadGitignore:
         assert spec.match_file('error.log')
         assert spec.match_file('vendor/')
 
+    def test_edited_gitignore_is_reloaded(self, tmp_path: Path):
+        gitignore = tmp_path / '.gitignore'
+        gitignore.write_text('*.log\n')
+        assert load_gitignore(tmp_path).match_file('error.log')
+        gitignore.write_text('*.tmp\nbuild/\n')
+        spec = load_gitignore(tmp_path)
+        assert spec.match_file('scratch.tmp')
+        assert not spec.match_file('error.log')
+
+    def test_repeated_queries_use_prefix(self):
+        spec = GitIgnoreSpec(pathspec.PathSpec.from_lines('gitignore', ['sub/build/']), prefix='sub')
+        assert spec.match_file('build/')
+        assert spec.match_file('build/')
+        assert not spec.match_file('main.py')
+
 
 class TestIsBinary:
     def test_text_file(self, tmp_path: Path):
@@ -78,6 +110,14 @@ class TestIsBinary:
     def test_nonexistent_file(self, tmp_path: Path):
         assert _is_binary(tmp_path / 'nope')
 
+    def test_only_leading_bytes_are_checked(self, tmp_path: Path):
+        f = tmp_path / 'late_nul.txt'
+        f.write_bytes(b'a' * BINARY_SNIFF_BYTES + b'\x00')
+        assert not _is_binary(f)
+
+    def test_directory_is_treated_as_binary(self, tmp_path: Path):
+        assert _is_binary(tmp_path)
+
 
 class TestWalkProject:
     def _setup_project(self, tmp_path: Path) -> Path:
@@ -106,6 +146,26 @@ class TestWalkProject:
         paths = {r[0].name for r in results}
         assert 'photo.png' not in paths
 
+    def test_binary_sniff_only_for_data_and_design(self, tmp_path: Path):
+        root = self._setup_project(tmp_path)
+        (root / 'data.json').write_bytes(b'{\x00}\n')
+        (root / 'page.html').write_bytes(b'<p>\x00</p>\n')
+        # Code files skip the sniff, so a stray NUL does not drop the file
+        (root / 'odd.py').write_bytes(b'x = 1\x00\n')
+        paths = {r[0].name for r in walk_project(root, set())}
+        assert 'data.json' not in paths
+        assert 'page.html' not in paths
+        assert 'odd.py' in paths
+
+    def test_sniffs_ts_shared_with_video(self, tmp_path: Path):
+        root = self._setup_project(tmp_path)
+        # .ts is also the MPEG transport stream extension, so TypeScript files are still sniffed
+        (root / 'seg.ts').write_bytes(b'G@\x00\x10' + bytes(184))
+        (root / 'app.ts').write_text('export const x = 1;\n')
+        paths = {r[0].name for r in walk_project(root, set())}
+        assert 'seg.ts' not in paths
+        assert 'app.ts' in paths
+
     def test_skips_unrecognized_extensions(self, tmp_path: Path):
         root = self._setup_project(tmp_path)
         (root / 'LICENSE').write_text('MIT License\n')
@@ -113,6 +173,17 @@ class TestWalkProject:
         paths = {r[0].name for r in results}
         assert 'LICENSE' not in paths
 
+    @pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason='requires named pipes')
+    def test_skips_fifo_named_like_source(self, tmp_path: Path):
+        root = self._setup_project(tmp_path)
+        os.mkfifo(root / 'pipe.py')
+        files = list(walk_project(root, set()))
+        assert 'pipe.py' not in {path.name for path, _ in files}
+        # Counting the walk's output end to end must not block on the pipe
+        tally = aggregate(count_files(files, jobs=1))
+        python = next(s for s in tally.by_language if s.language.name == 'Python')
+        assert python.file_count == 3
+
     def test_respects_excluded_dirs(self, tmp_path: Path):
         root = self._setup_project(tmp_path)
         results = list(walk_project(root, {'src'}))
@@ -127,6 +198,28 @@ class TestWalkProject:
         paths = {r[0].name for r in results}
         assert 'app.py' not in paths
 
+    def test_gitignored_directory_is_not_entered(self, tmp_path: Path):
+        root = self._setup_project(tmp_path)
+        pkg = root / 'node_modules' / 'pkg'
+        pkg.mkdir(parents=True)
+        (pkg / 'index.js').write_text('x\n')
+        # A file cannot be re-included below an ignored directory, as in git
+        (pkg / '.gitignore').write_text('!index.js\n')
+        (root / '.gitignore').write_text('node_modules/\n')
+        paths = {r[0].name for r in walk_project(root, set())}
+        assert 'index.js' not in paths
+        assert 'main.py' in paths
+
+    def test_windows_separators_in_exclusions(self, tmp_path: Path, monkeypatch):
+        root = self._setup_project(tmp_path)
+        (root / 'src' / 'gen').mkdir()
+        (root / 'src' / 'gen' / 'out.py').write_text('x = 1\n')
+        monkeypatch.setattr(os, 'sep', '\\')
+        results = list(walk_project(root, {'src\\gen'}))
+        names = {r[0].name for r in results}
+        assert 'out.py' not in names
+        assert 'app.py' in names
+
     def test_skips_hidden_directories(self, tmp_path: Path):
         root = self._setup_project(tmp_path)
         hidden = root / '.hidden'
@@ -136,6 +229,15 @@ class TestWalkProject:
         paths = {r[0].name for r in results}
         assert 'secret.py' not in paths
 
+    def test_yields_in_sorted_depth_first_order(self, tmp_path: Path):
+        root = self._setup_project(tmp_path)
+        (root / 'src' / 'nested').mkdir()
+        (root / 'src' / 'nested' / 'deep.py').write_text('z = 3\n')
+        (root / 'zz.py').write_text('w = 4\n')
+        results = list(walk_project(root, set()))
+        rel = [r[0].relative_to(root).as_posix() for r in results]
+        assert rel == ['README.md', 'lib.py', 'main.py', 'zz.py', 'src/app.py', 'src/nested/deep.py']
+
     def test_does_not_follow_symlinks(self, tmp_path: Path):
         root = self._setup_project(tmp_path)
         target = tmp_path / 'external'
@@ -147,6 +249,35 @@ class TestWalkProject:
         paths = {r[0].name for r in results}
         assert 'mod.py' not in paths or all(not str(r[0]).startswith(str(root / 'link')) for r in results)
 
+    def test_skips_dangling_symlink(self, tmp_path: Path):
+        root = self._setup_project(tmp_path)
+        (root / 'gone.py').symlink_to(tmp_path / 'missing.py')
+        (root / 'alias.py').symlink_to(root / 'main.py')
+        paths = {r[0].name for r in walk_project(root, set())}
+        assert 'gone.py' not in paths
+        # Symlinks to regular files are still counted
+        assert 'alias.py' in paths
+
+
+class TestWalkProjectNestedGitignore:
+    def test_nested_gitignore_applies_below_its_directory(self, tmp_path: Path):
+        for d in ('web', 'api'):
+            (tmp_path / d / 'dist').mkdir(parents=True)
+            (tmp_path / d / 'dist' / 'bundle.js').write_text('x\n')
+            (tmp_path / d / 'app.log.py').write_text('x = 1\n')
+        (tmp_path / 'web' / '.gitignore').write_text('dist/\n*.log.py\n')
+        rel = {r[0].relative_to(tmp_path).as_posix() for r in walk_project(tmp_path, set())}
+        assert rel == {'api/app.log.py', 'api/dist/bundle.js'}
+
+    def test_nested_negation_overrides_root_pattern(self, tmp_path: Path):
+        (tmp_path / '.gitignore').write_text('*.sql\n')
+        (tmp_path / 'db').mkdir()
+        (tmp_path / 'db' / '.gitignore').write_text('!schema.sql\n')
+        (tmp_path / 'db' / 'schema.sql').write_text('SELECT 1;\n')
+        (tmp_path / 'db' / 'dump.sql').write_text('SELECT 2;\n')
+        names = {r[0].name for r in walk_project(tmp_path, set())}
+        assert names == {'schema.sql'}
+
 
 class TestWalkProjectSpecs:
     def test_auto_detect_specs_dir(self, tmp_path: Path):